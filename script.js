@@ -38,7 +38,47 @@ document.addEventListener('DOMContentLoaded', () => {
     const ANSWERS_CATALOG_KEY = 'werkstoffquizAnswerCatalog'; // New
     const MIN_CATALOG_ANSWERS = 2; // Minimum distractors needed from catalog
 
-    function loadData() {
+    // Server mode: when served by "python werkstoffquiz_gui.py --server", rounds are drawn and
+    // checked by the shared Python quiz engine instead of localStorage.
+    const API_BASE = '/api';
+    let sessionId = null;
+
+    async function apiRequest(method, path, body) {
+        const response = await fetch(API_BASE + path, {
+            method: method,
+            headers: { 'Content-Type': 'application/json' },
+            body: body === undefined ? undefined : JSON.stringify(body)
+        });
+        const data = await response.json();
+        if (!response.ok) {
+            const error = new Error(data.error || response.statusText);
+            error.status = response.status;
+            throw error;
+        }
+        return data;
+    }
+
+    async function loadData() {
+        if (location.protocol.startsWith('http')) {
+            try {
+                sessionId = (await apiRequest('POST', '/session', {})).session;
+                await loadServerData();
+                return;
+            } catch (error) {
+                sessionId = null; // No quiz server behind this page, fall back to localStorage
+            }
+        }
+        loadLocalData();
+    }
+
+    async function loadServerData() {
+        const data = await apiRequest('GET', '/data');
+        questions = data.questions;
+        answerCatalog = data.catalog;
+        updateUIConditionally();
+    }
+
+    function loadLocalData() {
         const storedQuestions = localStorage.getItem(WERKSTOFFQUIZ_QUESTIONS_KEY);
         questions = storedQuestions ? JSON.parse(storedQuestions) : [];
 
@@ -118,6 +158,11 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
 
+        if (sessionId) {
+            showServerRound();
+            return;
+        }
+
         if (answerCatalog.length < MIN_CATALOG_ANSWERS) {
             questionTextElement.textContent = "Bitte fügen Sie dem Antwortkatalog genügend (mind. "+MIN_CATALOG_ANSWERS+") Antworten hinzu.";
             answerButtonsElement.innerHTML = '';
@@ -172,8 +217,56 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     }
 
-    function selectAnswer(e) {
+    async function showServerRound() {
+        answerButtonsElement.innerHTML = '';
+        let round;
+        try {
+            try {
+                round = await apiRequest('GET', '/round?session=' + encodeURIComponent(sessionId));
+            } catch (error) {
+                if (error.status !== 404) {
+                    throw error;
+                }
+                // Session expired or server restarted: start a new one
+                sessionId = (await apiRequest('POST', '/session', {})).session;
+                round = await apiRequest('GET', '/round?session=' + encodeURIComponent(sessionId));
+            }
+        } catch (error) {
+            questionTextElement.textContent = error.message;
+            return;
+        }
+        questionTextElement.textContent = round.question;
+        round.options.forEach(option => {
+            const button = document.createElement('button');
+            button.classList.add('btn', 'answer-btn');
+            button.textContent = option;
+            button.addEventListener('click', selectServerAnswer);
+            answerButtonsElement.appendChild(button);
+        });
+    }
+
+    async function selectServerAnswer(e) {
         const selectedButton = e.target;
+        Array.from(answerButtonsElement.children).forEach(button => { button.disabled = true; });
+        let result;
+        try {
+            result = await apiRequest('POST', '/check', { session: sessionId, answer: selectedButton.textContent });
+        } catch (error) {
+            feedbackTextElement.textContent = error.message;
+            nextQuestionBtn.classList.remove('hidden');
+            return;
+        }
+        Array.from(answerButtonsElement.children).forEach(button => {
+            button.dataset.correct = button.textContent === result.correctAnswer;
+        });
+        showAnswerResult(selectedButton);
+    }
+
+    function selectAnswer(e) {
+        showAnswerResult(e.target);
+    }
+
+    function showAnswerResult(selectedButton) {
         const isCorrect = selectedButton.dataset.correct === 'true';
 
         Array.from(answerButtonsElement.children).forEach(button => {
@@ -228,7 +321,7 @@ document.addEventListener('DOMContentLoaded', () => {
     }
     closeAddQuestionModalBtn.addEventListener('click', closeAddQuestionModal);
     
-    addQuestionForm.addEventListener('submit', (e) => {
+    addQuestionForm.addEventListener('submit', async (e) => {
         e.preventDefault();
         const questionText = newQuestionInput.value.trim();
         const correctAnswer = correctAnswerTextInput.value.trim();
@@ -237,6 +330,18 @@ document.addEventListener('DOMContentLoaded', () => {
             alert('Bitte fülle alle Felder aus (Frage und korrekte Antwort)!');
             return;
         }
+        if (sessionId) {
+            try {
+                await apiRequest('POST', '/questions', { question: questionText, correctAnswer: correctAnswer });
+            } catch (error) {
+                alert(error.message);
+                return;
+            }
+            closeAddQuestionModal();
+            await loadServerData();
+            alert('Frage erfolgreich hinzugefügt!');
+            return;
+        }
         // Check if correct answer is in catalog; if not, add it.
         // This ensures the correct answer can also be a distractor for other questions if desired.
         const lowerCaseCorrectAnswer = correctAnswer.toLowerCase();
@@ -298,9 +403,22 @@ document.addEventListener('DOMContentLoaded', () => {
     showAnswerCatalogModalBtn.addEventListener('click', openAnswerCatalogModal);
     closeAnswerCatalogModalBtn.addEventListener('click', closeAnswerCatalogModal);
 
-    addCatalogAnswerForm.addEventListener('submit', (e) => {
+    addCatalogAnswerForm.addEventListener('submit', async (e) => {
         e.preventDefault();
         const newAnswer = newCatalogAnswerInput.value.trim();
+        if (sessionId && newAnswer) {
+            try {
+                await apiRequest('POST', '/catalog', { answer: newAnswer });
+            } catch (error) {
+                alert(error.message);
+                return;
+            }
+            answerCatalog.push(newAnswer);
+            checkCatalogStatus();
+            renderAnswerCatalogList();
+            newCatalogAnswerInput.value = '';
+            return;
+        }
         if (newAnswer && !answerCatalog.some(ans => ans.toLowerCase() === newAnswer.toLowerCase())) {
             answerCatalog.push(newAnswer);
             saveAnswerCatalog(); // This also calls renderAnswerCatalogList
@@ -0,0 +1,231 @@
+"""Tests für Journal, Kompaktierung und SnapshotSaver (python -m pytest).
+
+Ein "Neustart" verwirft den Modulzustand (Snapshot-Hashes, Journallängen) und lädt die Fragen
+neu von der Platte, so wie es das Programm nach einem Absturz tut.
+"""
+import os
+import random
+import signal
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import werkstoffquiz_gui as quiz
+
+
+def question(i):
+    return quiz.Question(f"Frage {i}?", f"Antwort {i}")
+
+
+def as_tuples(questions):
+    return [(q.question, q.correct_answer) for q in questions]
+
+
+def restart():
+    """Simuliert einen Neustart und gibt die geladenen Fragen als Tupel zurück."""
+    quiz._snapshot_hashes.clear()
+    quiz._snapshot_stats.clear()
+    quiz._journal_lengths.clear()
+    return as_tuples(quiz.load_questions())
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(quiz, "USE_PACK_CACHE", False)
+    quiz._write_json_atomic(quiz.QUESTIONS_FILE, [question(0), question(1)])
+    restart()
+    yield tmp_path
+    quiz._snapshot_hashes.clear()
+    quiz._snapshot_stats.clear()
+    quiz._journal_lengths.clear()
+
+
+def add(items, q):
+    items.append(q)
+    quiz.append_journal(quiz.QUESTIONS_FILE, "add", q)
+
+
+# --- Journal und Kompaktierung ---
+
+def test_replay_applies_adds_and_removes():
+    items = [question(0), question(1)]
+    add(items, question(2))
+    add(items, question(3))
+    items.remove(question(1))
+    quiz.append_journal(quiz.QUESTIONS_FILE, "remove", question(1))
+    assert restart() == as_tuples(items)
+    assert quiz._journal_lengths[quiz.QUESTIONS_FILE] == 3
+
+
+def test_replay_skips_torn_last_line():
+    items = [question(0), question(1)]
+    add(items, question(2))
+    with open(quiz.journal_file_for(quiz.QUESTIONS_FILE), 'a', encoding='utf-8') as f:
+        f.write('{"op": "add", "value": {"quest') # Absturz mitten im Schreiben
+    assert restart() == as_tuples(items)
+    add(items, question(3)) # Schließt die abgeschnittene Zeile ab
+    assert restart() == as_tuples(items)
+
+
+def test_journal_of_other_snapshot_is_discarded():
+    add([question(0), question(1)], question(2))
+    # Snapshot ohne Journal-Kompaktierung ersetzt (z.B. von Hand bearbeitet)
+    quiz._write_json_atomic(quiz.QUESTIONS_FILE, [question(5)])
+    assert restart() == as_tuples([question(5)])
+    assert not os.path.exists(quiz.journal_file_for(quiz.QUESTIONS_FILE))
+
+
+def test_compaction_folds_journal_into_snapshot():
+    items = [question(0), question(1)]
+    for i in range(2, 6):
+        add(items, question(i))
+    quiz.compact_journal_if_needed(quiz.QUESTIONS_FILE, items, threshold=5)
+    assert os.path.exists(quiz.journal_file_for(quiz.QUESTIONS_FILE)) # Schwelle noch nicht erreicht
+    add(items, question(6))
+    quiz.compact_journal_if_needed(quiz.QUESTIONS_FILE, items, threshold=5)
+    assert not os.path.exists(quiz.journal_file_for(quiz.QUESTIONS_FILE))
+    assert restart() == as_tuples(items)
+    add(items, question(7)) # Neues Journal gehört zum neuen Snapshot
+    assert restart() == as_tuples(items)
+
+
+# --- SnapshotSaver ---
+
+class SimulatedCrash(Exception):
+    pass
+
+
+def crash_on_replace(monkeypatch, suffix):
+    """Lässt das os.replace auf eine Datei mit der Endung suffix scheitern; gibt das echte os.replace zurück."""
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if src.endswith(suffix):
+            raise SimulatedCrash(src)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", replace)
+    return real_replace
+
+
+def test_crash_between_snapshot_and_journal_replace(monkeypatch):
+    items = [question(0), question(1)]
+    add(items, question(2))
+    saver = quiz.SnapshotSaver(delay=60)
+    saver.schedule(quiz.QUESTIONS_FILE, items)
+    add(items, question(3)) # Nach dem Vormerken: muss im Journal bleiben
+    real_replace = crash_on_replace(monkeypatch, ".journal.jsonl.tmp")
+    saver.close()
+    monkeypatch.setattr(os, "replace", real_replace)
+    # Der Snapshot ist schon ersetzt, das alte Journal noch nicht
+    assert os.path.exists(quiz.journal_file_for(quiz.QUESTIONS_FILE) + ".tmp")
+    assert restart() == as_tuples(items)
+    assert not os.path.exists(quiz.journal_file_for(quiz.QUESTIONS_FILE) + ".tmp")
+    assert quiz._journal_lengths[quiz.QUESTIONS_FILE] == 1
+
+
+def test_crash_before_snapshot_replace(monkeypatch):
+    items = [question(0), question(1)]
+    add(items, question(2))
+    saver = quiz.SnapshotSaver(delay=60)
+    saver.schedule(quiz.QUESTIONS_FILE, items)
+    add(items, question(3))
+    real_replace = crash_on_replace(monkeypatch, quiz.QUESTIONS_FILE + ".tmp")
+    saver.close()
+    monkeypatch.setattr(os, "replace", real_replace)
+    # Der vorbereitete Journalrest gehört zum nie übernommenen Snapshot und wird verworfen
+    assert restart() == as_tuples(items)
+    assert not os.path.exists(quiz.journal_file_for(quiz.QUESTIONS_FILE) + ".tmp")
+
+
+def test_appends_and_schedules_during_commit(monkeypatch):
+    items = [question(0), question(1)]
+    add(items, question(2))
+    saver = quiz.SnapshotSaver(delay=60)
+    real_write = quiz._write_tmp_file
+    interleaved = []
+
+    def write_tmp_file(path, payload):
+        tmp_path = real_write(path, payload)
+        if path == quiz.QUESTIONS_FILE and not interleaved:
+            # Während der Snapshot geschrieben wird, ändert der Tk-Thread weiter
+            interleaved.append(True)
+            add(items, question(3))
+            saver.schedule(quiz.QUESTIONS_FILE, items)
+            add(items, question(4))
+        return tmp_path
+
+    monkeypatch.setattr(quiz, "_write_tmp_file", write_tmp_file)
+    saver.schedule(quiz.QUESTIONS_FILE, items)
+    assert saver.flush(timeout=10)
+    saver.close()
+    assert interleaved
+    assert restart() == as_tuples(items)
+    assert quiz._journal_lengths[quiz.QUESTIONS_FILE] == 1 # Nur question(4) liegt nach dem letzten Snapshot
+
+
+def test_randomized_append_remove_compact():
+    rng = random.Random(7)
+    items = [question(0), question(1)]
+    saver = quiz.SnapshotSaver(delay=0)
+    next_id = 2
+    for step in range(600):
+        action = rng.random()
+        if action < 0.55 or not items:
+            add(items, question(next_id))
+            next_id += 1
+        elif action < 0.8:
+            removed = items.pop(rng.randrange(len(items)))
+            quiz.append_journal(quiz.QUESTIONS_FILE, "remove", removed)
+        elif action < 0.9:
+            quiz.compact_journal_if_needed(quiz.QUESTIONS_FILE, items, threshold=rng.randint(1, 20), saver=saver)
+        else:
+            # Wie in on_close: synchron erst, wenn der Saver nichts mehr für die Datei schreibt
+            assert saver.flush(timeout=10)
+            quiz.compact_journal_if_needed(quiz.QUESTIONS_FILE, items, threshold=rng.randint(1, 20))
+        if step % 50 == 49:
+            assert saver.flush(timeout=10)
+            expected = as_tuples(items)
+            assert restart() == expected
+            items = [quiz.Question(*pair) for pair in expected]
+    saver.close()
+    assert restart() == as_tuples(items)
+
+
+CHILD = textwrap.dedent("""
+    import sys
+    sys.path.insert(0, {module_dir!r})
+    import werkstoffquiz_gui as quiz
+    quiz.USE_PACK_CACHE = False
+    items = list(quiz.load_questions())
+    saver = quiz.SnapshotSaver(delay=0)
+    i = len(items)
+    while True:
+        q = quiz.Question(f"Frage {{i}}?", f"Antwort {{i}}")
+        items.append(q)
+        quiz.append_journal(quiz.QUESTIONS_FILE, "add", q)
+        quiz.compact_journal_if_needed(quiz.QUESTIONS_FILE, items, threshold=7, saver=saver)
+        print(i, flush=True)
+        i += 1
+""")
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="SIGKILL nicht verfügbar")
+def test_sigkill_keeps_every_acknowledged_append(workdir):
+    script = CHILD.format(module_dir=os.path.dirname(os.path.abspath(quiz.__file__)))
+    rng = random.Random(3)
+    for _ in range(3):
+        child = subprocess.Popen([sys.executable, "-c", script], cwd=workdir, stdout=subprocess.PIPE, text=True)
+        acknowledged = None
+        for _ in range(rng.randint(20, 200)):
+            acknowledged = int(child.stdout.readline())
+        child.send_signal(signal.SIGKILL)
+        child.wait()
+        child.stdout.close()
+        loaded = restart()
+        # Alles Bestätigte ist da, danach höchstens weitere Fragen in Reihenfolge, nichts doppelt
+        assert len(loaded) > acknowledged
+        assert loaded == as_tuples(question(i) for i in range(len(loaded)))
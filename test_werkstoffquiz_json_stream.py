@@ -0,0 +1,67 @@
+"""Tests für den stückweisen JSON-Array-Leser iter_json_array (python -m pytest).
+
+Kleine Stückgrößen zwingen Zahlen, Escapes und Mehrbyte-Zeichen über Stückgrenzen.
+"""
+import json
+
+import pytest
+
+import werkstoffquiz_gui as quiz
+
+
+CHUNK_SIZES = range(1, 8)
+
+DOCUMENTS = [
+    '[]',
+    ' \n[ ]\n ',
+    '[0, -1, 12345678901234567890, 1.5, -0.25, 3.0e10, 2E-3, 1e+2, -7.125E+01]',
+    '[1.0,2.5e3,[4e-1,5.0],6]',
+    '["a\\"b", "tab\\tnew\\nline", "\\\\", "\\/", "\\u00e4\\u00df", "\\ud83d\\ude00", ""]',
+    '["Kühlung", "Gefüge: α-Fe", "Härte ≥ 300 HV", "😀 Emoji", "日本語"]',
+    '[{"question": "Was ist \\"Stahl\\"?", "correct_answer": "Fe-C ≤ 2,06 %"}, '
+    '{"question": "Dichte?", "correct_answer": 7.85e3}, true, false, null]',
+    '[\n  {"a": [1, {"b": "c]"}], "d": "[,]"},\n  "}{"\n]\n',
+]
+
+
+@pytest.fixture(autouse=True)
+def clear_snapshot_state():
+    yield
+    quiz._snapshot_hashes.clear()
+    quiz._snapshot_stats.clear()
+
+
+def write(tmp_path, text):
+    path = str(tmp_path / "data.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", DOCUMENTS)
+def test_matches_json_loads(tmp_path, text, chunk_size):
+    path = write(tmp_path, text)
+    items = list(quiz.iter_json_array(path, chunk_size=chunk_size))
+    assert [value for _, _, value in items] == json.loads(text)
+    assert [position for position, _, _ in items] == list(range(len(items)))
+    # Der Zeichen-Offset zeigt auf den Anfang des Elements
+    decoder = json.JSONDecoder()
+    for _, offset, value in items:
+        assert decoder.raw_decode(text, offset)[0] == value
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", ['[1,]', '[1]x', '[1 2]', '[1', '[', '', '["offen'])
+def test_syntax_errors(tmp_path, text, chunk_size):
+    path = write(tmp_path, text)
+    with pytest.raises(json.JSONDecodeError):
+        list(quiz.iter_json_array(path, chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", ['{}', '"[]"', '1'])
+def test_not_a_list(tmp_path, text, chunk_size):
+    path = write(tmp_path, text)
+    with pytest.raises(ValueError):
+        list(quiz.iter_json_array(path, chunk_size=chunk_size))
@@ -0,0 +1,188 @@
+"""Benchmarks für das Werkstoffquiz über synthetische Datenbestände.
+
+Erzeugt questions.json/answer_catalog.json in mehreren Größen (je Größe in einem temporären
+Verzeichnis) und misst ohne Oberfläche, wie Laden, Speichern, Fragenauswahl mit Distraktoren
+und die Duplikatprüfung des Katalogs skalieren.
+
+    python werkstoffquiz_bench.py                      # Alle Größen, Vergleich mit der Baseline
+    python werkstoffquiz_bench.py --sizes 10 1000      # Nur ausgewählte Größen
+    python werkstoffquiz_bench.py --save-baseline      # Ergebnisse als neue Baseline speichern
+
+Liegt eine Baseline vor, werden Messungen, die mehr als --tolerance langsamer sind, als
+Regression gemeldet und das Skript endet mit Exit-Code 1. Die Baseline hängt vom Rechner ab
+und wird deshalb nicht eingecheckt (.gitignore).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import werkstoffquiz_gui as quiz
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+BASELINE_FILE = "werkstoffquiz_bench_baseline.json"
+MIN_DELTA_MS = 0.05 # Kleinere Abweichungen gelten als Messrauschen
+
+WORDS = ["Stahl", "Gusseisen", "Aluminium", "Kupfer", "Messing", "Titan", "Polymer", "Keramik",
+         "Gefüge", "Korngrenze", "Versetzung", "Martensit", "Austenit", "Ferrit", "Härte", "Zähigkeit"]
+
+
+def write_synthetic_data(size, rng):
+    """Schreibt size Katalogeinträge und size Fragen, deren Antworten aus dem Katalog stammen."""
+    catalog = [f"{rng.choice(WORDS)} {rng.choice(WORDS)} Nr. {i}: {' '.join(rng.choices(WORDS, k=6))}"
+               for i in range(size)]
+    questions = [{"question": f"Frage {i}: Was kennzeichnet {rng.choice(WORDS)} im Zusammenhang mit "
+                              f"{rng.choice(WORDS)}?",
+                  "correctAnswer": rng.choice(catalog)}
+                 for i in range(size)]
+    for path, data in ((quiz.QUESTIONS_FILE, questions), (quiz.CATALOG_FILE, catalog)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+
+
+def best_of(repeat, func, setup=None):
+    """Minimale Laufzeit in Millisekunden über repeat Durchläufe."""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _close_questions(questions):
+    """Gibt die mmap eines Fragenpakets frei (load_questions liefert dann eine PackedQuestionList)."""
+    if isinstance(questions, quiz.PackedQuestionList):
+        questions.close()
+
+
+def _load_questions_closed():
+    _close_questions(quiz.load_questions())
+
+
+def _remove_packs():
+    if os.path.exists(quiz.QUESTIONS_PACK_FILE):
+        os.remove(quiz.QUESTIONS_PACK_FILE)
+
+
+def bench_size(size, repeat, operations, seed):
+    """Misst alle Operationen für eine Bestandsgröße; Ergebnisse in ms (bei *_per_call je Aufruf)."""
+    rng = random.Random(seed)
+    results = {}
+    previous_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            write_synthetic_data(size, rng)
+            quiz.USE_PACK_CACHE = False
+            results["load_questions_json"] = best_of(repeat, _load_questions_closed)
+            results["load_answer_catalog_json"] = best_of(repeat, quiz.load_answer_catalog)
+            quiz.USE_PACK_CACHE = True
+            results["build_pack_cache"] = best_of(repeat, _load_questions_closed, _remove_packs)
+            results["load_questions_pack"] = best_of(repeat, _load_questions_closed)
+
+            questions = quiz.load_questions()
+            catalog = quiz.load_answer_catalog()
+            # Entspricht WerkstoffquizApp.save_all_data
+            results["save_all_data"] = best_of(repeat, lambda: (quiz.compact_journal(quiz.QUESTIONS_FILE, questions),
+                                                                quiz.compact_journal(quiz.CATALOG_FILE, catalog)))
+
+            engine = quiz.QuizEngine(questions, catalog, rng=random.Random(seed))
+            results["next_round_per_call"] = best_of(
+                repeat, lambda: [engine.next_round() for _ in range(operations)]) / operations
+
+            # Duplikatprüfung wie in ManageCatalogDialog.add_to_catalog: je zur Hälfte vorhandene
+            # (in anderer Schreibweise) und fehlende Antworten
+            entries = list(catalog)
+            probes = [rng.choice(entries).upper() if i % 2 else f"Fehlende Antwort {i}" for i in range(operations)]
+            results["catalog_contains_per_call"] = best_of(
+                repeat, lambda: [answer in catalog for answer in probes]) / operations
+            counter = iter(range(10 ** 9))
+            results["catalog_add_per_call"] = best_of(
+                repeat, lambda: [catalog.add(f"Neue Antwort {next(counter)}") for _ in range(operations)]) / operations
+            _close_questions(questions)
+        finally:
+            quiz.USE_PACK_CACHE = True
+            os.chdir(previous_directory)
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms=MIN_DELTA_MS):
+    """Gibt eine Liste (Größe, Operation, Baseline, aktuell) aller Regressionen zurück."""
+    regressions = []
+    for size, operations in results.items():
+        for name, value in operations.items():
+            reference = baseline.get(size, {}).get(name)
+            if reference is None:
+                continue
+            if value > reference * (1 + tolerance) and value - reference > min_delta_ms:
+                regressions.append((size, name, reference, value))
+    return regressions
+
+
+def print_table(results, baseline=None):
+    sizes = list(results)
+    names = list(next(iter(results.values())))
+    print(f"{'Operation (ms)':<28}" + "".join(f"{size:>18}" for size in sizes))
+    for name in names:
+        cells = []
+        for size in sizes:
+            value = results[size][name]
+            reference = (baseline or {}).get(size, {}).get(name)
+            cell = f"{value:.4g}"
+            if reference:
+                cell += f" ({value / reference:.2f}x)"
+            cells.append(f"{cell:>18}")
+        print(f"{name:<28}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks über synthetische Kataloge")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3, help="Durchläufe je Messung (Minimum zählt)")
+    parser.add_argument("--operations", type=int, default=1000,
+                        help="Aufrufe je Messung für die *_per_call-Operationen")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="Ergebnisse als Baseline speichern")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="Erlaubte Verlangsamung gegenüber der Baseline (0.3 = 30 %%)")
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        print(f"Messe {size} Einträge...", file=sys.stderr)
+        results[str(size)] = bench_size(size, args.repeat, args.operations, args.seed)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get("results", {})
+    print_table(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({"python": sys.version.split()[0], "platform": platform.platform(),
+                       "created": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}, f, indent=4)
+        print(f"Baseline nach {args.baseline} geschrieben.")
+        return 0
+    if baseline is None:
+        print(f"Keine Baseline ({args.baseline}) vorhanden; mit --save-baseline anlegen.")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for size, name, reference, value in regressions:
+        print(f"REGRESSION {name} bei {size} Einträgen: {reference:.4g} ms -> {value:.4g} ms "
+              f"({value / reference:.2f}x)")
+    if not regressions:
+        print("Keine Regressionen gegenüber der Baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
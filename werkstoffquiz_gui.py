@@ -1,11 +1,98 @@
+import argparse
+import asyncio
+import bisect
+import codecs
+import collections
+import concurrent.futures
+import csv
+import functools
+import hashlib
+import heapq
+import itertools
 import json
+import math
+import mmap
+import multiprocessing
 import os
+import queue
 import random # Import hier oben sammeln
+import re
+import secrets
+import struct
+import sys
+import threading
+import time
 import tkinter as tk
+import urllib.parse
+import zlib
+from array import array
+from tkinter import font as tkfont
+from tkinter import filedialog
 from tkinter import messagebox
 
+try:
+    import numpy as np
+except ImportError: # NumPy ist optional und wird nur für ähnliche Distraktoren benötigt
+    np = None
+
+try:
+    from pypdf import PdfReader
+except ImportError: # Nur für den Import des PDF-Fragenkatalogs nötig
+    PdfReader = None
+
 QUESTIONS_FILE = "questions.json"
 CATALOG_FILE = "answer_catalog.json"
+QUESTIONS_PACK_FILE = "questions.pack"
+DECK_STATE_FILE = "quiz_deck_state.bin"
+SRS_STATE_FILE = "quiz_srs_state.jsonl"
+SIMILARITY_CACHE_FILE = "answer_catalog.simindex.npz"
+ANSWER_LOG_FILE = "quiz_answers.log"
+ANSWER_STATS_FILE = "quiz_answers.stats.npz"
+
+# Änderungen werden als JSON-Lines-Journal an den Snapshot angehängt, statt bei jeder
+# Bearbeitung die kompletten Dateien neu zu schreiben.
+USE_JOURNAL = True
+JOURNAL_COMPACT_THRESHOLD = 200 # Ab so vielen Journal-Einträgen wird in den Snapshot zurückgeschrieben
+DECK_SAVE_INTERVAL = 10 # Stapelposition alle n gezogenen Fragen sichern
+SAVE_COALESCE_SECONDS = 0.5 # Änderungen innerhalb dieser Zeit werden im Hintergrund gemeinsam geschrieben
+JSON_STREAM_CHUNK_SIZE = 64 * 1024 # Zeichen, die der Fragen-Loader pro Schritt einliest
+USE_PACK_CACHE = True # Fragen aus einem kompilierten Binärpaket statt aus JSON laden, solange es zur Quelldatei passt
+
+# Fragenauswahl: "deck" (zufällig ohne Wiederholung) oder "srs" (Leitner-Wiederholung)
+SELECTION_MODE = "deck"
+LEITNER_INTERVALS = [0, 10 * 60, 24 * 3600, 3 * 24 * 3600, 7 * 24 * 3600, 21 * 24 * 3600] # Sekunden je Box
+LEITNER_RETRY_DELAY = 60 # Falsch beantwortete Fragen frühestens nach einer Minute wiederholen
+
+# Distraktoren: "random" (gleichverteilt) oder "similar" (ähnliche Katalogeinträge, benötigt NumPy)
+DISTRACTOR_MODE = "random"
+SIMILARITY_NGRAM = 3
+SIMILARITY_DIMENSIONS = 1024
+SIMILARITY_NEIGHBOURS = 8
+
+# Fenster sofort anzeigen und die Daten in einem Hintergrund-Thread laden
+BACKGROUND_LOADING = True
+LOAD_POLL_MS = 20 # Intervall, in dem der Tk-Thread auf geladene Daten prüft
+
+SEARCH_DEBOUNCE_MS = 150 # Suche erst starten, wenn so lange nicht getippt wurde
+SEARCH_RESULT_LIMIT = 200
+
+# Beinahe-Duplikate: 64 MinHash-Werte in 16 Bändern à 4 Zeilen, Warnung ab 70 % geschätzter Ähnlichkeit
+NEAR_DUPLICATE_SHINGLE = 5
+NEAR_DUPLICATE_PERMUTATIONS = 64
+NEAR_DUPLICATE_BANDS = 16
+NEAR_DUPLICATE_THRESHOLD = 0.7
+
+IMPORT_PDF_PAGES_PER_WORKER = 4 # Kleinere PDFs ohne Prozesspool lesen, dessen Start lohnt sich erst ab mehreren Seiten
+
+# HTTP/JSON-Server für die Weboberfläche (python werkstoffquiz_gui.py --server)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_SESSION_LIMIT = 10000 # Höchstens so viele Sitzungen gleichzeitig im Speicher halten
+SERVER_MAX_BODY = 1024 * 1024
+
+# Messpunkte aktivieren: python werkstoffquiz_gui.py --profile oder WERKSTOFFQUIZ_PROFILE=1
+PROFILE_ENV_VAR = "WERKSTOFFQUIZ_PROFILE"
+PROFILE_OUTPUT_FILE = "werkstoffquiz_profile.json"
 
 DEFAULT_CATALOG = [
     "Polyethylen (PE)", "Polytetrafluorethylen (PTFE)", "Aluminiumoxid (Al2O3)",
@@ -17,117 +104,2459 @@ DEFAULT_CATALOG = [
     "Bronze", "Aluminium", "Polypropylen (PP)", "Polyvinylchlorid (PVC)"
 ]
 
-def load_questions():
-    """Lädt Fragen aus der QUESTIONS_FILE JSON-Datei."""
+# Hash (und os.stat) des zuletzt gelesenen/geschriebenen Snapshots und Anzahl der Journal-Einträge je Datei
+_snapshot_hashes = {}
+_snapshot_stats = {}
+_journal_lengths = {}
+_journal_lock = threading.Lock() # Journal-Dateien werden auch vom SnapshotSaver-Thread umgeschrieben
+
+# --- Messpunkte (Profiling) ---
+# Mit @profiled markierte Funktionen bleiben unverändert, solange kein Profiler aktiv ist.
+# enable_profiling() ersetzt sie dann durch zeitmessende Hüllen; deshalb muss es vor dem
+# Anlegen der App aufgerufen werden (Tk bindet Event-Handler als gebundene Methoden).
+
+_profiled_names = []
+PROFILER = None
+
+def profiled(func):
+    """Registriert eine Funktion oder Methode als Messpunkt."""
+    _profiled_names.append(func.__qualname__)
+    return func
+
+class Profiler:
+    """Zählt Aufrufe und sammelt ein Latenz-Histogramm je Messpunkt."""
+    BUCKET_BOUNDS_MS = (0.01, 0.03, 0.1, 0.3, 1, 3, 10, 30, 100, 300, 1000, 3000, 10000)
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.metrics = {} # Name -> [Anzahl, Summe, Minimum, Maximum, Bucket-Zähler] (Sekunden)
+        self._lock = threading.Lock() # Laden und Speichern laufen auch in Hintergrund-Threads
+
+    def record(self, name, seconds):
+        bucket = bisect.bisect_left(self.BUCKET_BOUNDS_MS, seconds * 1000)
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = [0, 0.0, seconds, seconds, [0] * (len(self.BUCKET_BOUNDS_MS) + 1)]
+            metric[0] += 1
+            metric[1] += seconds
+            metric[2] = min(metric[2], seconds)
+            metric[3] = max(metric[3], seconds)
+            metric[4][bucket] += 1
+
+    def wrap(self, name, func):
+        clock = self.clock
+        record = self.record
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, clock() - start)
+        return timed
+
+    def _percentile_ms(self, metric, fraction):
+        """Obergrenze des Buckets, in den das Quantil fällt (für den letzten Bucket das Maximum)."""
+        target = fraction * metric[0]
+        seen = 0
+        for bound, count in zip(self.BUCKET_BOUNDS_MS, metric[4]):
+            seen += count
+            if seen >= target:
+                return min(bound, metric[3] * 1000)
+        return metric[3] * 1000
+
+    def report(self):
+        elapsed = max(self.clock() - self.started, 1e-9)
+        with self._lock:
+            metrics = {name: [m[0], m[1], m[2], m[3], list(m[4])] for name, m in self.metrics.items()}
+        result = {}
+        for name, metric in sorted(metrics.items()):
+            count, total = metric[0], metric[1]
+            labels = [f"<={bound}ms" for bound in self.BUCKET_BOUNDS_MS] + [f">{self.BUCKET_BOUNDS_MS[-1]}ms"]
+            result[name] = {
+                "calls": count,
+                "calls_per_second": count / elapsed,
+                "total_ms": total * 1000,
+                "mean_ms": total * 1000 / count,
+                "min_ms": metric[2] * 1000,
+                "max_ms": metric[3] * 1000,
+                "p50_ms": self._percentile_ms(metric, 0.5),
+                "p99_ms": self._percentile_ms(metric, 0.99),
+                "histogram": {label: n for label, n in zip(labels, metric[4]) if n},
+            }
+        return {"elapsed_seconds": elapsed, "metrics": result}
+
+    def dump(self, path=PROFILE_OUTPUT_FILE):
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.report(), f, indent=4)
+            print(f"Profil nach {path} geschrieben.")
+        except Exception as e:
+            print(f"Fehler beim Schreiben des Profils {path}: {e}")
+
+def enable_profiling():
+    """Aktiviert den Profiler und instrumentiert alle mit @profiled markierten Funktionen."""
+    global PROFILER
+    if PROFILER is not None:
+        return PROFILER
+    PROFILER = Profiler()
+    module = sys.modules[__name__]
+    for qualname in _profiled_names:
+        owner_path, _, attribute = qualname.rpartition(".")
+        owner = module
+        for part in filter(None, owner_path.split(".")):
+            owner = getattr(owner, part)
+        setattr(owner, attribute, PROFILER.wrap(qualname, getattr(owner, attribute)))
+    return PROFILER
+
+def dump_profile(path=PROFILE_OUTPUT_FILE):
+    if PROFILER is not None:
+        PROFILER.dump(path)
+
+def _dump_json_bytes(data):
+    """Serialisiert Daten so, wie sie in den JSON-Dateien abgelegt werden."""
+    return json.dumps(data, indent=4, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+def _write_tmp_file(path, payload):
+    """Schreibt payload vollständig und per fsync gesichert nach path + ".tmp" und gibt diesen Pfad zurück."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp_path
+
+def _fsync_directory(path):
+    """Sichert den Verzeichniseintrag von path, damit ein os.replace/os.remove auch einen
+    Stromausfall übersteht. Unter Windows lassen sich Verzeichnisse nicht öffnen."""
+    if os.name != "posix":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _write_json_atomic(path, data):
+    """Schreibt JSON erst in eine temporäre Datei und ersetzt das Ziel dann atomar.
+    Ein Absturz mitten im Schreiben lässt die alte Datei unversehrt."""
+    payload = _dump_json_bytes(data)
+    os.replace(_write_tmp_file(path, payload), path)
+    _fsync_directory(path)
+    _snapshot_hashes[path] = hashlib.sha1(payload).hexdigest()
+
+def _read_snapshot(path):
+    """Liest eine JSON-Datei und merkt sich den Hash ihres Inhalts.
+    Gibt None zurück, wenn die Datei nicht existiert."""
+    if not os.path.exists(path):
+        _snapshot_hashes[path] = None
+        return None
+    with open(path, 'rb') as f:
+        _snapshot_stats[path] = os.fstat(f.fileno())
+        raw = f.read()
+    _snapshot_hashes[path] = hashlib.sha1(raw).hexdigest()
+    return json.loads(raw.decode('utf-8'))
+
+def journal_file_for(data_file):
+    """Pfad des Änderungsjournals zu einer Datendatei, z.B. questions.journal.jsonl."""
+    base, _ = os.path.splitext(data_file)
+    return base + ".journal.jsonl"
+
+@profiled
+def append_journal(data_file, op, value):
+    """Hängt einen Änderungsdatensatz ("add" oder "remove") an das Journal an.
+    Die erste Zeile eines Journals verweist auf den Hash des Snapshots, zu dem es gehört."""
+    path = journal_file_for(data_file)
+    record = json.dumps({"op": op, "value": value}, ensure_ascii=False, default=_json_default)
+    with _journal_lock:
+        lines = []
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            lines.append(json.dumps({"op": "base", "hash": _snapshot_hashes.get(data_file)}))
+            _journal_lengths[data_file] = 0
+        else:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    lines.append("") # Abgeschnittene Zeile eines Absturzes abschließen
+        lines.append(record)
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            _journal_lengths[data_file] = _journal_lengths.get(data_file, 0) + 1
+        except Exception as e:
+            print(f"Fehler beim Schreiben des Journals {path}: {e}")
+
+def _adopt_prepared_journal(data_file, path):
+    """Übernimmt einen vom SnapshotSaver vorbereiteten Journalrest (path + ".tmp"), falls er zum
+    aktuellen Snapshot gehört, und verwirft ihn sonst (Absturz vor dem Ersetzen des Snapshots)."""
+    prepared = path + ".tmp"
+    if not os.path.exists(prepared):
+        return
+    try:
+        with open(prepared, 'rb') as f:
+            header = json.loads(f.readline())
+    except ValueError:
+        header = None
+    snapshot_hash = _snapshot_hashes.get(data_file)
+    if isinstance(header, dict) and snapshot_hash is not None and header.get("hash") == snapshot_hash:
+        os.replace(prepared, path)
+        _fsync_directory(path)
+    else:
+        os.remove(prepared)
+
+def replay_journal(data_file, items, parse=None):
+    """Spielt das Journal einer Datei auf die bereits geladenen Snapshot-Einträge ein.
+    parse wandelt einen Journal-Wert in einen Eintrag um (None = ungültig).
+    Ein Journal, das zu einem anderen Snapshot gehört (z.B. nach einem Absturz während der
+    Kompaktierung), ist bereits im Snapshot enthalten und wird verworfen.
+    Gibt die Anzahl der angewendeten Einträge zurück."""
+    path = journal_file_for(data_file)
+    _journal_lengths[data_file] = 0
+    _adopt_prepared_journal(data_file, path)
+    if not os.path.exists(path):
+        return 0
+    applied = 0
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Typischerweise eine beim Absturz abgeschnittene letzte Zeile
+                    print(f"Warnung: Unlesbare Zeile {line_no} in {path}. Wird übersprungen.")
+                    continue
+                op = record.get("op") if isinstance(record, dict) else None
+                if line_no == 1:
+                    if op != "base" or record.get("hash") != _snapshot_hashes.get(data_file):
+                        print(f"Hinweis: {path} gehört nicht zum aktuellen Snapshot und wird verworfen.")
+                        f.close()
+                        os.remove(path)
+                        return 0
+                    continue
+                value = record.get("value")
+                if parse is not None:
+                    value = parse(value)
+                if value is None:
+                    print(f"Warnung: Ungültiger Journal-Eintrag in Zeile {line_no} von {path}: {value}. Wird übersprungen.")
+                    continue
+                if op == "add":
+                    items.append(value)
+                elif op == "remove":
+                    try:
+                        items.remove(value)
+                    except ValueError:
+                        pass
+                else:
+                    print(f"Warnung: Unbekannte Journal-Operation '{op}' in {path}. Wird übersprungen.")
+                    continue
+                applied += 1
+    except Exception as e:
+        print(f"Ein unerwarteter Fehler ist beim Einspielen von {path} aufgetreten: {e}")
+    _journal_lengths[data_file] = applied
+    return applied
+
+@profiled
+def compact_journal(data_file, items):
+    """Schreibt den aktuellen Stand atomar als neuen Snapshot und entfernt danach das Journal.
+    Nicht parallel zu einem SnapshotSaver verwenden, der dieselbe Datei schreibt (vorher flush())."""
+    try:
+        _write_json_atomic(data_file, list(items))
+    except Exception as e:
+        print(f"Fehler beim Kompaktieren von {data_file}: {e}")
+        return
+    path = journal_file_for(data_file)
+    if os.path.exists(path):
+        os.remove(path)
+    _journal_lengths[data_file] = 0
+
+def compact_journal_if_needed(data_file, items, threshold=JOURNAL_COMPACT_THRESHOLD, saver=None):
+    """Kompaktiert das Journal, sobald es threshold Einträge erreicht hat.
+    Mit einem SnapshotSaver geschieht das im Hintergrund statt im aufrufenden Thread."""
+    if _journal_lengths.get(data_file, 0) < threshold:
+        return
+    if saver is None:
+        compact_journal(data_file, items)
+    elif not saver.is_pending(data_file): # Neuere Einträge bleiben bis dahin im Journal
+        saver.schedule(data_file, items)
+
+class SnapshotSaver:
+    """Write-behind-Speicherung: schreibt Snapshots in einem Hintergrund-Thread.
+
+    schedule() kopiert nur die Eintragsliste und merkt sich, wie weit das Journal zu diesem
+    Zeitpunkt reichte. Alles, was innerhalb von delay Sekunden für dieselbe Datei vorgemerkt
+    wird, ergibt einen einzigen Schreibvorgang (temporäre Datei, fsync, os.replace). Danach
+    bleiben im Journal nur die Einträge, die nach dem Snapshot angehängt wurden.
+    Über schedule_file() lassen sich auch fertige Binärinhalte ohne Journal (z.B. der
+    Fragenstapel) im Hintergrund schreiben.
+    flush() wartet, bis alles Vorgemerkte dauerhaft auf der Platte liegt.
+    """
+
+    def __init__(self, delay=SAVE_COALESCE_SECONDS):
+        self.delay = delay
+        self._pending = {} # Datendatei -> (Einträge, Journalgröße in Bytes beim Vormerken bzw. None)
+        self._due = None # Zeitpunkt, zu dem der nächste Schreibvorgang beginnt
+        self._writing = False
+        self._flushing = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def is_pending(self, data_file):
+        with self._condition:
+            return data_file in self._pending
+
+    def schedule(self, data_file, items):
+        """Merkt den aktuellen Stand von items zum Schreiben nach data_file vor."""
+        snapshot = list(items)
+        path = journal_file_for(data_file)
+        with _journal_lock, self._condition:
+            journal_size = os.path.getsize(path) if os.path.exists(path) else 0
+            self._enqueue(data_file, snapshot, journal_size)
+
+    def schedule_file(self, path, payload):
+        """Merkt payload (bytes) zum atomaren Schreiben nach path vor; ohne Journal."""
+        with self._condition:
+            self._enqueue(path, payload, None)
+
+    def _enqueue(self, path, content, journal_size):
+        if self._closed:
+            raise RuntimeError("SnapshotSaver ist bereits geschlossen")
+        self._pending[path] = (content, journal_size)
+        if self._due is None:
+            self._due = time.monotonic() + self.delay
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="SnapshotSaver", daemon=True)
+            self._thread.start()
+        self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Blockiert, bis alle vorgemerkten Snapshots geschrieben sind. Gibt False bei Timeout zurück."""
+        with self._condition:
+            self._flushing += 1
+            self._condition.notify_all()
+            try:
+                return self._condition.wait_for(lambda: not self._pending and not self._writing, timeout)
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout=None):
+        """Schreibt alles Vorgemerkte und beendet den Thread."""
+        done = self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return done
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._pending and (self._flushing or self._closed or time.monotonic() >= self._due):
+                        break
+                    if not self._pending and self._closed:
+                        return
+                    self._condition.wait(None if not self._pending else max(0.0, self._due - time.monotonic()))
+                batch, self._pending, self._due = self._pending, {}, None
+                self._writing = True
+            try:
+                for data_file, (snapshot, journal_size) in batch.items():
+                    try:
+                        if journal_size is None:
+                            os.replace(_write_tmp_file(data_file, snapshot), data_file)
+                            _fsync_directory(data_file)
+                        else:
+                            self._commit(data_file, snapshot, journal_size)
+                    except Exception as e:
+                        print(f"Fehler beim Speichern von {data_file} im Hintergrund: {e}")
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    @profiled
+    def _commit(self, data_file, snapshot, journal_size):
+        payload = _dump_json_bytes(snapshot) # Serialisieren und fsync außerhalb der Sperre
+        digest = hashlib.sha1(payload).hexdigest()
+        tmp_path = _write_tmp_file(data_file, payload)
+        path = journal_file_for(data_file)
+        with _journal_lock, self._condition:
+            newer = self._pending.get(data_file) # Während des Schreibens erneut vorgemerkt?
+            data = b""
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    f.seek(journal_size)
+                    data = f.read()
+            # Einträge nach dem Snapshot behalten, getrennt nach "vor/nach dem neueren Vormerken"
+            split = max(0, newer[1] - journal_size) if newer else len(data)
+            before, after = (self._records(part) for part in (data[:split], data[split:]))
+            # Der Journalrest wird vor dem Snapshot fertig geschrieben. Stürzt das Programm zwischen
+            # den beiden os.replace ab, übernimmt replay_journal ihn anhand des Snapshot-Hashes.
+            head = b""
+            journal_tmp_path = None
+            if before or after:
+                head = b"".join(line + b"\n" for line in [json.dumps({"op": "base", "hash": digest}).encode('utf-8')] + before)
+                journal_tmp_path = _write_tmp_file(path, head + b"".join(line + b"\n" for line in after))
+            os.replace(tmp_path, data_file)
+            _fsync_directory(data_file) # Der Snapshot muss vor dem neuen Journal dauerhaft sein
+            _snapshot_hashes[data_file] = digest
+            if journal_tmp_path is not None:
+                os.replace(journal_tmp_path, path)
+            elif os.path.exists(path):
+                os.remove(path)
+            _fsync_directory(path)
+            _journal_lengths[data_file] = len(before) + len(after)
+            if newer:
+                self._pending[data_file] = (newer[0], len(head))
+
+    @staticmethod
+    def _records(data):
+        """Journalzeilen ohne Leerzeilen und ohne "base"-Kopfzeilen."""
+        return [line for line in data.splitlines() if line.strip() and not line.startswith(b'{"op": "base"')]
+
+class AnswerCatalog:
+    """Antwortkatalog mit Einfügereihenfolge und casefold-normalisiertem Hash-Index.
+
+    Mitgliedschaft, Duplikatprüfung und Entfernen kosten O(1). Entfernte Einträge
+    hinterlassen Lücken (None) in der Slot-Liste, die kompaktiert werden, sobald sie
+    mehr als die Hälfte der Slots ausmachen.
+    """
+
+    def __init__(self, items=()):
+        self._slots = []  # Einträge in Einfügereihenfolge, None = entfernt
+        self._index = {}  # casefold-Schlüssel -> Position in _slots
+        self._sorted_keys = None # Sortierte Schlüssel für die Anzeige, erst bei Bedarf aufgebaut
+        for item in items:
+            self.add(item)
+
+    @staticmethod
+    def normalize(text):
+        return text.casefold()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self):
+        return (item for item in self._slots if item is not None)
+
+    def __contains__(self, text):
+        return isinstance(text, str) and text.casefold() in self._index
+
+    def __repr__(self):
+        return f"AnswerCatalog({len(self)} Einträge)"
+
+    def get(self, text):
+        """Gibt die gespeicherte Schreibweise eines Eintrags zurück oder None."""
+        pos = self._index.get(text.casefold())
+        return None if pos is None else self._slots[pos]
+
+    def add(self, text):
+        """Fügt einen Eintrag hinzu, falls er (case-insensitive) noch fehlt.
+        Gibt True zurück, wenn der Eintrag neu war."""
+        key = text.casefold()
+        if key in self._index:
+            return False
+        self._index[key] = len(self._slots)
+        self._slots.append(text)
+        if self._sorted_keys is not None:
+            bisect.insort(self._sorted_keys, key)
+        return True
+
+    append = add # Listen-kompatibel, z.B. für replay_journal
+
+    def remove(self, text):
+        """Entfernt einen Eintrag (case-insensitive). Wirft ValueError wie list.remove."""
+        pos = self._index.pop(text.casefold(), None)
+        if pos is None:
+            raise ValueError(f"{text!r} ist nicht im Katalog")
+        self._slots[pos] = None
+        if self._sorted_keys is not None:
+            del self._sorted_keys[bisect.bisect_left(self._sorted_keys, text.casefold())]
+        if len(self._slots) > 2 * len(self._index):
+            self._compact()
+
+    def _compact(self):
+        self._slots = [item for item in self._slots if item is not None]
+        self._index = {item.casefold(): pos for pos, item in enumerate(self._slots)}
+
+    def to_list(self):
+        return list(self)
+
+    def sorted_view(self):
+        """Alphabetisch (case-insensitive) sortierte Sicht auf den Katalog mit Zugriff in O(1).
+        Der sortierte Index wird einmal aufgebaut und danach per binärer Suche gepflegt."""
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self._index)
+        return SortedCatalogView(self)
+
+    def sample(self, k, exclude=None, rng=None):
+        """Zieht k verschiedene Einträge (ohne exclude) in erwartet O(k) per Rejection-Sampling
+        über die Slot-Positionen, ohne den Katalog zu kopieren.
+        Gibt None zurück, wenn nicht genug Einträge vorhanden sind."""
+        rng = rng or random
+        excluded_pos = self._index.get(exclude.casefold()) if exclude is not None else None
+        available = len(self._index) - (excluded_pos is not None)
+        if available < k:
+            return None
+        if 2 * k > available:
+            # Sehr kleiner Katalog: Hier wäre die Ablehnungsrate hoch, direkt aus den Kandidaten ziehen
+            candidates = [item for pos, item in enumerate(self._slots) if item is not None and pos != excluded_pos]
+            return rng.sample(candidates, k)
+        # Höchstens die Hälfte der Slots sind Lücken (siehe _compact), daher erwartet O(k) Versuche
+        chosen = {}
+        slot_count = len(self._slots)
+        while len(chosen) < k:
+            pos = rng.randrange(slot_count)
+            if pos == excluded_pos or pos in chosen:
+                continue
+            item = self._slots[pos]
+            if item is not None:
+                chosen[pos] = item
+        return list(chosen.values())
+
+class SortedCatalogView:
+    """Sequenz über die Einträge eines AnswerCatalog in sortierter Reihenfolge."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def __len__(self):
+        return len(self.catalog._sorted_keys)
+
+    def __getitem__(self, position):
+        catalog = self.catalog
+        return catalog._slots[catalog._index[catalog._sorted_keys[position]]]
+
+    def position(self, text):
+        """Position eines Eintrags in der sortierten Reihenfolge (binäre Suche)."""
+        return bisect.bisect_left(self.catalog._sorted_keys, text.casefold())
+
+def sample_distractors(catalog, correct_answer, k=2, rng=None):
+    """Wählt k verschiedene Distraktoren aus dem Katalog, die nicht der korrekten Antwort
+    entsprechen (case-insensitive). Gibt None zurück, wenn der Katalog nicht genug hergibt.
+    Über rng (z.B. random.Random(seed)) ist die Auswahl reproduzierbar."""
+    return catalog.sample(k, exclude=correct_answer, rng=rng)
+
+DECK_STATE_MAGIC = b"WQDK"
+_DECK_STATE_HEADER = struct.Struct("<4sII") # Magic, Stapelgröße, Anzahl offener Fragen
+
+class QuestionDeck:
+    """Zieht Fragen ohne Zurücklegen (wie availableQuestionIndices in script.js).
+
+    Die noch offenen Indizes liegen in einem array('I'); gezogen wird per Swap-Remove in O(1).
+    Ist der Stapel leer, wird er beim nächsten Ziehen neu befüllt. Neu hinzugekommene
+    Fragen werden an den laufenden Durchgang angehängt, ohne den Stapel neu aufzubauen.
+    """
+
+    def __init__(self, size=0, remaining=None, rng=None):
+        self.rng = rng or random
+        self.size = size
+        self.remaining = array('I', range(size)) if remaining is None else array('I', remaining)
+
+    def __len__(self):
+        return len(self.remaining)
+
+    def grow(self, new_size):
+        """Nimmt die Fragen mit Index size..new_size-1 in den laufenden Durchgang auf."""
+        if new_size > self.size:
+            self.remaining.extend(range(self.size, new_size))
+            self.size = new_size
+
+    def draw(self):
+        """Zieht einen zufälligen, in diesem Durchgang noch nicht gestellten Index.
+        Gibt None zurück, wenn es keine Fragen gibt."""
+        if self.size == 0:
+            return None
+        if not self.remaining: # Durchgang beendet -> Stapel neu auflegen
+            self.remaining = array('I', range(self.size))
+        pos = self.rng.randrange(len(self.remaining))
+        self.remaining[pos], self.remaining[-1] = self.remaining[-1], self.remaining[pos]
+        return self.remaining.pop()
+
+    def record(self, index, correct):
+        """Der Stapel ignoriert Antworten; Schnittstelle wie SpacedRepetitionScheduler."""
+
+    def to_bytes(self):
+        """Binärer Zustand: Header (Magic, Stapelgröße, Anzahl offener Fragen) + uint32-Indizes."""
+        remaining = self.remaining
+        if sys.byteorder != "little":
+            remaining = array('I', remaining)
+            remaining.byteswap()
+        return _DECK_STATE_HEADER.pack(DECK_STATE_MAGIC, self.size, len(remaining)) + remaining.tobytes()
+
+def _read_deck_state():
+    """Liest (Stapelgröße, offene Indizes) aus DECK_STATE_FILE oder None, wenn es sie nicht gibt."""
+    if not os.path.exists(DECK_STATE_FILE):
+        return None
+    with open(DECK_STATE_FILE, 'rb') as f:
+        data = f.read()
+    magic, size, count = _DECK_STATE_HEADER.unpack_from(data)
+    if magic != DECK_STATE_MAGIC or len(data) != _DECK_STATE_HEADER.size + 4 * count:
+        raise ValueError("ungültiges Format")
+    remaining = array('I')
+    remaining.frombytes(data[_DECK_STATE_HEADER.size:])
+    if sys.byteorder != "little":
+        remaining.byteswap()
+    return size, remaining
+
+def load_deck_state(question_count, rng=None):
+    """Stellt den Fragenstapel aus DECK_STATE_FILE wieder her, damit ein Neustart den laufenden
+    Durchgang fortsetzt. Passt den Stapel an die aktuelle Fragenanzahl an."""
+    try:
+        state = _read_deck_state()
+        if state is not None:
+            saved_size = min(state[0], question_count)
+            seen = set()
+            remaining = array('I')
+            for index in state[1]:
+                if 0 <= index < saved_size and index not in seen:
+                    seen.add(index)
+                    remaining.append(index)
+            deck = QuestionDeck(saved_size, remaining, rng)
+            deck.grow(question_count)
+            return deck
+    except Exception as e:
+        print(f"Warnung: {DECK_STATE_FILE} konnte nicht gelesen werden ({e}). Starte neuen Durchgang.")
+    return QuestionDeck(question_count, rng=rng)
+
+def save_deck_state(deck, saver=None):
+    """Speichert die Position im aktuellen Durchgang in DECK_STATE_FILE.
+    Mit einem SnapshotSaver wird im Hintergrund geschrieben, sonst sofort."""
+    payload = deck.to_bytes()
+    try:
+        if saver is not None:
+            saver.schedule_file(DECK_STATE_FILE, payload)
+        else:
+            os.replace(_write_tmp_file(DECK_STATE_FILE, payload), DECK_STATE_FILE)
+            _fsync_directory(DECK_STATE_FILE)
+    except Exception as e:
+        print(f"Fehler beim Speichern des Fragenstapels in {DECK_STATE_FILE}: {e}")
+
+class SpacedRepetitionScheduler:
+    """Leitner-Wiederholung: falsch beantwortete Fragen kommen bald wieder, richtige seltener.
+
+    Box und Fälligkeit jeder Frage liegen in kompakten Arrays (array('B') / array('d')),
+    die nächste Frage liefert ein Min-Heap nach Fälligkeit. Veraltete Heap-Einträge werden
+    beim Ziehen verworfen (lazy deletion), jede Antwort kostet damit O(log n).
+    """
+
+    def __init__(self, size=0, rng=None, clock=time.time):
+        self.rng = rng or random
+        self.clock = clock
+        self.boxes = array('B')
+        self.due = array('d')
+        self.heap = []
+        self.on_record = None # Callback(index, box, due) für die inkrementelle Persistenz
+        self.grow(size)
+
+    def __len__(self):
+        return len(self.due)
+
+    def grow(self, new_size):
+        """Nimmt neue Fragen auf; sie sind sofort fällig (in Reihenfolge ihres Index)."""
+        for index in range(len(self.due), new_size):
+            self.boxes.append(0)
+            self.due.append(0.0)
+            heapq.heappush(self.heap, (0.0, index))
+
+    def set_state(self, index, box, due):
+        """Setzt den gespeicherten Zustand einer Frage (beim Laden)."""
+        self.boxes[index] = min(box, len(LEITNER_INTERVALS) - 1)
+        self.due[index] = due
+        heapq.heappush(self.heap, (due, index))
+
+    def _compact_heap(self):
+        self.heap = [(due, index) for index, due in enumerate(self.due)]
+        heapq.heapify(self.heap)
+
+    def draw(self):
+        """Gibt die am frühesten fällige Frage zurück (auch wenn sie noch nicht fällig ist).
+        Die Frage wird vorläufig um LEITNER_RETRY_DELAY zurückgestellt, bis record() sie einplant."""
+        if not self.due:
+            return None
+        if len(self.heap) > 2 * len(self.due) + 64:
+            self._compact_heap()
+        while True:
+            due, index = self.heap[0]
+            if self.due[index] == due:
+                break
+            heapq.heappop(self.heap) # Veralteter Eintrag
+        deferred = max(due, self.clock()) + LEITNER_RETRY_DELAY
+        self.due[index] = deferred
+        heapq.heapreplace(self.heap, (deferred, index))
+        return index
+
+    def record(self, index, correct):
+        """Plant eine Frage nach einer Antwort neu ein: richtig -> nächste Box, falsch -> Box 0."""
+        now = self.clock()
+        if correct:
+            box = min(self.boxes[index] + 1, len(LEITNER_INTERVALS) - 1)
+            due = now + LEITNER_INTERVALS[box]
+        else:
+            box = 0
+            due = now + LEITNER_RETRY_DELAY
+        self.boxes[index] = box
+        self.due[index] = due
+        heapq.heappush(self.heap, (due, index))
+        if self.on_record is not None:
+            self.on_record(index, box, due)
+
+def load_srs_state(question_count, rng=None):
+    """Stellt den Wiederholungsplan aus SRS_STATE_FILE wieder her (JSON Lines, letzter Eintrag
+    je Frage gewinnt) und hängt jede weitere Antwort als eine Zeile an."""
+    scheduler = SpacedRepetitionScheduler(question_count, rng)
+    lines = 0
+    if os.path.exists(SRS_STATE_FILE):
+        try:
+            with open(SRS_STATE_FILE, 'r', encoding='utf-8') as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        index, box, due = json.loads(line)
+                    except (ValueError, TypeError):
+                        continue # Abgeschnittene Zeile nach einem Absturz
+                    if isinstance(index, int) and 0 <= index < question_count:
+                        scheduler.set_state(index, int(box), float(due))
+        except Exception as e:
+            print(f"Warnung: {SRS_STATE_FILE} konnte nicht gelesen werden ({e}). Starte mit leerem Plan.")
+    if lines > 2 * question_count + 100:
+        save_srs_state(scheduler) # Nur den letzten Stand je Frage behalten
+    scheduler.on_record = _append_srs_state
+    return scheduler
+
+def _append_srs_state(index, box, due):
+    try:
+        with open(SRS_STATE_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps([index, box, due]) + "\n")
+    except Exception as e:
+        print(f"Fehler beim Speichern des Wiederholungsplans in {SRS_STATE_FILE}: {e}")
+
+def save_srs_state(scheduler):
+    """Schreibt den kompletten Wiederholungsplan kompakt (eine Zeile je beantworteter Frage)."""
+    lines = [json.dumps([index, box, due]) for index, (box, due) in enumerate(zip(scheduler.boxes, scheduler.due))
+             if due > 0]
+    tmp_path = SRS_STATE_FILE + ".tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("".join(line + "\n" for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, SRS_STATE_FILE)
+        _fsync_directory(SRS_STATE_FILE)
+    except Exception as e:
+        print(f"Fehler beim Speichern des Wiederholungsplans in {SRS_STATE_FILE}: {e}")
+
+# --- Kompiliertes Fragenpaket (Cache) ---
+# Binärformat: Header, Offset-Tabelle der Strings, Datensätze als String-IDs, UTF-8-Blob.
+# Gleiche Strings (z.B. mehrfach verwendete Antworten) werden nur einmal abgelegt.
+
+PACK_MAGIC = b"WQPK"
+PACK_VERSION = 1
+_PACK_HEADER = struct.Struct("<4sHHqQ20sII") # Magic, Version, Felder, mtime_ns, Größe, SHA-1, #Strings, #Datensätze
+
+def _source_fingerprint(path):
+    """mtime und Größe der zuletzt gelesenen Quelldatei (bzw. jetzt, falls nicht bekannt)."""
+    st = _snapshot_stats.get(path) or os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+class StringPack:
+    """Nur-lesender Zugriff auf ein per mmap geöffnetes Paket; Strings werden erst beim
+    Zugriff dekodiert, der Speicherbedarf bleibt damit unabhängig von der Paketgröße."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # Leere Datei
+            self._file.close()
+            raise
+        (magic, version, self.fields, self.source_mtime_ns, self.source_size, sha1,
+         self.string_count, self.record_count) = _PACK_HEADER.unpack_from(self._mm, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self.close()
+            raise ValueError("Unbekanntes Paketformat")
+        self.source_sha1 = sha1.hex()
+        self._offsets_start = _PACK_HEADER.size
+        self._records_start = self._offsets_start + 8 * (self.string_count + 1)
+        self._record = struct.Struct(f"<{self.fields}I")
+        if len(self._mm) < self._records_start + self._record.size * self.record_count:
+            self.close()
+            raise ValueError("Paket ist unvollständig")
+
+    def __len__(self):
+        return self.record_count
+
+    def string(self, string_id):
+        start, end = struct.unpack_from("<QQ", self._mm, self._offsets_start + 8 * string_id)
+        return self._mm[start:end].decode('utf-8')
+
+    def record(self, index):
+        """Gibt den Datensatz index als Tupel von Strings zurück."""
+        ids = self._record.unpack_from(self._mm, self._records_start + self._record.size * index)
+        return tuple(self.string(string_id) for string_id in ids)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+def write_pack(path, source_path, records, fields):
+    """Kompiliert records (Tupel aus fields Strings) zu einem Paket für source_path."""
+    tmp_path = path + ".tmp"
+    try:
+        string_ids = {}
+        blobs = []
+        ids = array('I')
+        for record in records:
+            for text in record:
+                string_id = string_ids.get(text)
+                if string_id is None:
+                    string_id = string_ids[text] = len(blobs)
+                    blobs.append(text.encode('utf-8'))
+                ids.append(string_id)
+        mtime_ns, size = _source_fingerprint(source_path)
+        sha1 = bytes.fromhex(_snapshot_hashes[source_path])
+        header = _PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, fields, mtime_ns, size, sha1, len(blobs), len(ids) // fields)
+        offsets = array('Q')
+        position = len(header) + 8 * (len(blobs) + 1) + 4 * len(ids)
+        for blob in blobs:
+            offsets.append(position)
+            position += len(blob)
+        offsets.append(position)
+        if sys.byteorder != "little":
+            ids.byteswap()
+            offsets.byteswap()
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(offsets.tobytes())
+            f.write(ids.tobytes())
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Hinweis: Cache {path} konnte nicht geschrieben werden: {e}")
+
+def open_pack(path, source_path, fields):
+    """Öffnet das Paket zu source_path, wenn es aktuell ist, sonst None.
+    Aktuell heißt: mtime und Größe stimmen überein, oder der Inhalt hat denselben SHA-1."""
+    if not os.path.exists(path) or not os.path.exists(source_path):
+        return None
+    try:
+        pack = StringPack(path)
+    except Exception as e:
+        print(f"Hinweis: Cache {path} ist unbrauchbar ({e}) und wird neu erstellt.")
+        return None
+    st = os.stat(source_path)
+    if pack.fields != fields:
+        pack.close()
+        return None
+    if (st.st_mtime_ns, st.st_size) != (pack.source_mtime_ns, pack.source_size):
+        with open(source_path, 'rb') as f:
+            if hashlib.sha1(f.read()).hexdigest() != pack.source_sha1:
+                pack.close()
+                return None
+    _snapshot_hashes[source_path] = pack.source_sha1
+    return pack
+
+class PackedQuestionList:
+    """Fragenliste auf Basis eines StringPack: Fragen werden erst beim Zugriff dekodiert.
+    Neue Fragen landen in einer normalen Liste dahinter; erst ein remove() (selten, nur beim
+    Einspielen des Journals) wandelt die Liste komplett in Python-Objekte um."""
+
+    def __init__(self, pack):
+        self._pack = pack
+        self._extra = []
+        self._items = None # Vollständig dekodierte Liste nach remove()
+
+    def __len__(self):
+        if self._items is not None:
+            return len(self._items)
+        return len(self._pack) + len(self._extra)
+
+    def __getitem__(self, index):
+        if self._items is not None:
+            return self._items[index]
+        if index < 0:
+            index += len(self)
+        if 0 <= index < len(self._pack):
+            question, correct_answer = self._pack.record(index)
+            return Question(question, correct_answer)
+        return self._extra[index - len(self._pack)]
+
+    def __iter__(self):
+        if self._items is not None:
+            return iter(self._items)
+        return itertools.chain((self[i] for i in range(len(self._pack))), self._extra)
+
+    def append(self, question):
+        if self._items is not None:
+            self._items.append(question)
+        else:
+            self._extra.append(question)
+
+    def remove(self, question):
+        if self._items is None:
+            self._items = list(self)
+        self._items.remove(question)
+
+    def close(self):
+        """Gibt die mmap des Pakets frei; danach sind nur noch bereits dekodierte Fragen nutzbar."""
+        self._pack.close()
+
+class Question:
+    """Eine Frage mit korrekter Antwort. Kompakter als ein dict mit zwei Schlüsseln."""
+    __slots__ = ("question", "correct_answer")
+
+    def __init__(self, question, correct_answer):
+        self.question = question
+        self.correct_answer = correct_answer
+
+    def __eq__(self, other):
+        return (isinstance(other, Question) and self.question == other.question
+                and self.correct_answer == other.correct_answer)
+
+    def __hash__(self):
+        return hash((self.question, self.correct_answer))
+
+    def __repr__(self):
+        return f"Question({self.question!r}, {self.correct_answer!r})"
+
+    def to_dict(self):
+        """Darstellung wie in questions.json."""
+        return {"question": self.question, "correctAnswer": self.correct_answer}
+
+    @classmethod
+    def from_dict(cls, entry, answers=None):
+        """Erzeugt eine Frage aus einem JSON-Eintrag oder gibt None zurück, wenn er ungültig ist.
+        answers dient als Intern-Tabelle, damit gleiche Antworten nur einmal im Speicher liegen."""
+        if not isinstance(entry, dict):
+            return None
+        question = entry.get("question")
+        correct_answer = entry.get("correctAnswer")
+        if not isinstance(question, str) or not isinstance(correct_answer, str):
+            return None
+        if answers is not None:
+            correct_answer = answers.setdefault(correct_answer, correct_answer)
+        return cls(question, correct_answer)
+
+def _json_default(obj):
+    """Erlaubt json.dump(s), Question-Objekte direkt zu serialisieren."""
+    if isinstance(obj, Question):
+        return obj.to_dict()
+    raise TypeError(f"Objekt vom Typ {type(obj).__name__} ist nicht JSON-serialisierbar")
+
+def iter_json_array(path, chunk_size=JSON_STREAM_CHUNK_SIZE):
+    """Liest ein JSON-Array stückweise und liefert (Position, Zeichen-Offset, Eintrag) je Element,
+    ohne die ganze Datei oder das ganze Array im Speicher zu halten.
+    Wirft ValueError, wenn die Datei kein Array enthält, und json.JSONDecodeError bei Syntaxfehlern.
+    SHA-1 und os.stat der Datei werden wie bei _read_snapshot für das Journal vermerkt."""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        _snapshot_stats[path] = os.fstat(f.fileno())
+
+        def read_more():
+            raw = f.read(chunk_size)
+            digest.update(raw)
+            return text_decoder.decode(raw, final=not raw), not raw
+
+        try:
+            buffer, eof = read_more()
+            consumed = 0 # Zeichen vor buffer[0], für Positionsangaben
+            pos = 0
+            expect = "["
+            position = 0
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos == len(buffer):
+                    if eof:
+                        raise json.JSONDecodeError("Unerwartetes Dateiende", buffer, pos)
+                    consumed += pos
+                    buffer, eof = read_more()
+                    pos = 0
+                    continue
+                char = buffer[pos]
+                if expect == "[":
+                    if char != "[":
+                        raise ValueError("enthält keine Liste")
+                    pos += 1
+                    expect = "value_or_end"
+                elif char == "]" and expect in ("value_or_end", "comma_or_end"):
+                    # Nach der Liste ist wie bei json.load nur noch Leerraum erlaubt
+                    pos += 1
+                    while True:
+                        while pos < len(buffer) and buffer[pos].isspace():
+                            pos += 1
+                        if pos < len(buffer):
+                            raise json.JSONDecodeError("Zusätzliche Daten nach der Liste", buffer, pos)
+                        if eof:
+                            return
+                        consumed += pos
+                        buffer, eof = read_more()
+                        pos = 0
+                elif expect == "comma_or_end":
+                    if char != ",":
+                        raise json.JSONDecodeError("',' oder ']' erwartet", buffer, pos)
+                    pos += 1
+                    expect = "value"
+                else:
+                    try:
+                        value, end = decoder.raw_decode(buffer, pos)
+                        # Eine Zahl am Pufferende oder vor ".", "e", "+", "-" (z.B. "1." | "5e10") könnte
+                        # im nächsten Stück weitergehen
+                        complete = eof or not (end == len(buffer) or isinstance(value, (int, float))
+                                               and not isinstance(value, bool) and buffer[end] in ".eE+-")
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                        complete = False
+                    if not complete:
+                        # Element reicht über den Puffer hinaus: Rest behalten und nachladen
+                        consumed += pos
+                        more, eof = read_more()
+                        buffer = buffer[pos:] + more
+                        pos = 0
+                        continue
+                    yield position, consumed + pos, value
+                    position += 1
+                    pos = end
+                    expect = "comma_or_end"
+                    if pos > chunk_size: # Verarbeiteten Teil des Puffers freigeben
+                        consumed += pos
+                        buffer = buffer[pos:]
+                        pos = 0
+        finally:
+            # Auch bei Fehlern den Hash über die ganze Datei bilden
+            while True:
+                raw = f.read(chunk_size)
+                if not raw:
+                    break
+                digest.update(raw)
+            _snapshot_hashes[path] = digest.hexdigest()
+
+def _read_questions_snapshot():
+    """Lädt die Fragen aus dem QUESTIONS_FILE-Snapshot (ohne Journal) in einem Durchgang:
+    Die Datei wird stückweise geparst, jeder Eintrag sofort validiert und als Question abgelegt."""
     if not os.path.exists(QUESTIONS_FILE):
+        _snapshot_hashes[QUESTIONS_FILE] = None
         return []
+    questions = []
+    answers = {} # Viele Fragen teilen sich dieselbe korrekte Antwort
     try:
-        with open(QUESTIONS_FILE, 'r', encoding='utf-8') as f:
-            questions = json.load(f)
-            # Validierung, ob es eine Liste von Dictionaries ist
-            if not isinstance(questions, list):
-                print(f"Warnung: {QUESTIONS_FILE} enthält keine Liste. Wird als leer behandelt.")
-                return []
-            for q in questions:
-                if not isinstance(q, dict) or "question" not in q or "correctAnswer" not in q:
-                    print(f"Warnung: Ungültiger Frageneintrag in {QUESTIONS_FILE} gefunden: {q}. Wird übersprungen.")
-                    # Optional: remove invalid entry or handle differently
-            return [q for q in questions if isinstance(q, dict) and "question" in q and "correctAnswer" in q]
-    except json.JSONDecodeError:
-        print(f"Fehler beim Dekodieren von JSON aus {QUESTIONS_FILE}. Datei ist möglicherweise korrupt.")
+        for position, offset, entry in iter_json_array(QUESTIONS_FILE):
+            question = Question.from_dict(entry, answers)
+            if question is None:
+                print(f"Warnung: Ungültiger Frageneintrag Nr. {position + 1} (Zeichen {offset}) in {QUESTIONS_FILE}: {entry}. Wird übersprungen.")
+                continue
+            questions.append(question)
+        return questions
+    except json.JSONDecodeError as e:
+        print(f"Fehler beim Dekodieren von JSON aus {QUESTIONS_FILE} nach {len(questions)} Einträgen: {e.msg}. Datei ist möglicherweise korrupt.")
+        return []
+    except ValueError:
+        print(f"Warnung: {QUESTIONS_FILE} enthält keine Liste. Wird als leer behandelt.")
         return []
     except Exception as e:
         print(f"Ein unerwarteter Fehler ist beim Laden von {QUESTIONS_FILE} aufgetreten: {e}")
         return []
 
-def save_questions(questions):
-    """Speichert die Fragenliste in die QUESTIONS_FILE JSON-Datei."""
-    try:
-        with open(QUESTIONS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(questions, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"Fehler beim Speichern der Fragen in {QUESTIONS_FILE}: {e}")
-
-def load_answer_catalog():
-    """Lädt den Antwortkatalog aus der CATALOG_FILE JSON-Datei.
-    Initialisiert mit DEFAULT_CATALOG, wenn die Datei nicht existiert oder leer ist."""
-    if not os.path.exists(CATALOG_FILE):
-        save_answer_catalog(DEFAULT_CATALOG) # Speichert den Default Katalog, wenn Datei nicht existiert
-        return DEFAULT_CATALOG
+@profiled
+def load_questions():
+    """Lädt Fragen aus der QUESTIONS_FILE JSON-Datei und spielt das Journal darauf ein.
+    Ist das kompilierte Paket aktuell, wird es statt der JSON-Datei per mmap geöffnet."""
+    pack = open_pack(QUESTIONS_PACK_FILE, QUESTIONS_FILE, 2) if USE_PACK_CACHE else None
+    if pack is not None:
+        questions = PackedQuestionList(pack)
+    else:
+        questions = _read_questions_snapshot()
+        if USE_PACK_CACHE and _snapshot_hashes.get(QUESTIONS_FILE):
+            write_pack(QUESTIONS_PACK_FILE, QUESTIONS_FILE,
+                       ((q.question, q.correct_answer) for q in questions), 2)
+    replay_journal(QUESTIONS_FILE, questions, Question.from_dict)
+    return questions
+
+def _read_catalog_snapshot():
+    """Lädt den Antwortkatalog aus dem CATALOG_FILE-Snapshot (ohne Journal).
+    Gibt None zurück, wenn mit dem Default-Katalog initialisiert werden muss."""
     try:
-        with open(CATALOG_FILE, 'r', encoding='utf-8') as f:
-            catalog = json.load(f)
-            if not isinstance(catalog, list): # Einfache Validierung
-                print(f"Warnung: {CATALOG_FILE} enthält keine Liste. Initialisiere mit Default-Katalog.")
-                save_answer_catalog(DEFAULT_CATALOG)
-                return DEFAULT_CATALOG
-            if not catalog: # Wenn Katalog leer ist
-                print(f"Hinweis: {CATALOG_FILE} ist leer. Initialisiere mit Default-Katalog.")
-                save_answer_catalog(DEFAULT_CATALOG)
-                return DEFAULT_CATALOG
-            # Sicherstellen, dass alle Elemente Strings sind
-            if not all(isinstance(item, str) for item in catalog):
-                print(f"Warnung: {CATALOG_FILE} enthält nicht nur Strings. Filtere ungültige Einträge.")
-                catalog = [item for item in catalog if isinstance(item, str)]
-                if not catalog: # Wenn nach Filterung leer
-                    save_answer_catalog(DEFAULT_CATALOG)
-                    return DEFAULT_CATALOG
-            return catalog
+        catalog = _read_snapshot(CATALOG_FILE)
+        if catalog is None:
+            return None
+        if not isinstance(catalog, list): # Einfache Validierung
+            print(f"Warnung: {CATALOG_FILE} enthält keine Liste. Initialisiere mit Default-Katalog.")
+            return None
+        if not catalog: # Wenn Katalog leer ist
+            print(f"Hinweis: {CATALOG_FILE} ist leer. Initialisiere mit Default-Katalog.")
+            return None
+        # Sicherstellen, dass alle Elemente Strings sind
+        if not all(isinstance(item, str) for item in catalog):
+            print(f"Warnung: {CATALOG_FILE} enthält nicht nur Strings. Filtere ungültige Einträge.")
+            catalog = [item for item in catalog if isinstance(item, str)]
+            if not catalog: # Wenn nach Filterung leer
+                return None
+        return catalog
     except json.JSONDecodeError:
         print(f"Fehler beim Dekodieren von JSON aus {CATALOG_FILE}. Initialisiere mit Default.")
-        save_answer_catalog(DEFAULT_CATALOG)
-        return DEFAULT_CATALOG
+        return None
     except Exception as e:
         print(f"Ein unerwarteter Fehler ist beim Laden von {CATALOG_FILE} aufgetreten: {e}. Initialisiere mit Default.")
-        save_answer_catalog(DEFAULT_CATALOG)
-        return DEFAULT_CATALOG
+        return None
 
+@profiled
+def load_answer_catalog():
+    """Lädt den Antwortkatalog aus der CATALOG_FILE JSON-Datei und spielt das Journal darauf ein.
+    Initialisiert mit DEFAULT_CATALOG, wenn die Datei nicht existiert oder leer ist.
+    Anders als die Fragen wird der Katalog immer komplett gebraucht; eine flache String-Liste
+    liest der JSON-Parser schneller, als sie sich aus einem Paket dekodieren ließe."""
+    snapshot = _read_catalog_snapshot()
+    use_default = snapshot is None
+    catalog = AnswerCatalog(DEFAULT_CATALOG if use_default else snapshot)
+    replayed = replay_journal(CATALOG_FILE, catalog, lambda item: item if isinstance(item, str) else None)
+    if use_default:
+        # Default-Katalog (inkl. eingespielter Änderungen) als neuen Snapshot festschreiben
+        if replayed:
+            compact_journal(CATALOG_FILE, catalog)
+        else:
+            save_answer_catalog(catalog)
+    return catalog
+
+@profiled
 def save_answer_catalog(catalog):
-    """Speichert die Katalogliste in die CATALOG_FILE JSON-Datei."""
+    """Speichert die Katalogliste atomar in die CATALOG_FILE JSON-Datei."""
     try:
-        with open(CATALOG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(catalog, f, indent=4, ensure_ascii=False)
+        _write_json_atomic(CATALOG_FILE, list(catalog))
     except Exception as e:
         print(f"Fehler beim Speichern des Antwortkatalogs in {CATALOG_FILE}: {e}")
 
+# --- Ähnlichkeitsbasierte Distraktoren ---
+# Zeichen-n-Gramme werden per Hashing auf SIMILARITY_DIMENSIONS Spalten abgebildet und
+# TF-IDF-gewichtet; die nächsten Nachbarn jedes Katalogeintrags werden vorab berechnet.
+
+def catalog_content_hash(catalog):
+    """Hash über den Inhalt des Katalogs, Schlüssel für den Ähnlichkeits-Cache."""
+    digest = hashlib.sha1()
+    for item in catalog:
+        digest.update(item.casefold().encode('utf-8'))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class SimilarityIndex:
+    """Nächste-Nachbarn-Index über die Katalogeinträge (benötigt NumPy).
+
+    Für jeden Eintrag werden die SIMILARITY_NEIGHBOURS ähnlichsten Einträge (Kosinus über
+    TF-IDF-gewichtete Zeichen-n-Gramme) vorab bestimmt, eine Abfrage kostet damit O(k).
+    Neue Einträge werden inkrementell eingerechnet: Nur die Ähnlichkeiten der neuen Zeilen
+    zu allen anderen werden berechnet und in die bestehenden Top-k-Listen einsortiert.
+    Die IDF-Gewichte bleiben dabei eingefroren, bis sich der Katalog seit dem letzten
+    vollständigen Aufbau verdoppelt hat. Die Zeilen-Arrays wachsen dabei mit Reservekapazität
+    (amortisiert), statt bei jedem Hinzufügen komplett kopiert zu werden.
+    Der Cache enthält nur Texte, IDF-Gewichte und Nachbarlisten; die dichten Vektoren werden
+    nach dem Laden erst beim nächsten add() aus den Texten neu berechnet.
+    """
+
+    BLOCK_SIZE = 1024 # Zeilen pro Matrixprodukt beim vollständigen Aufbau
+
+    def __init__(self, neighbours=None, dimensions=None):
+        self.k = neighbours or SIMILARITY_NEIGHBOURS
+        self.dimensions = dimensions or SIMILARITY_DIMENSIONS
+        self.texts = []
+        self.rows = {} # casefold-Schlüssel -> Zeile
+        self.idf = np.ones(self.dimensions, dtype=np.float32)
+        self.vectors = np.zeros((0, self.dimensions), dtype=np.float32) # None: nach dem Laden noch nicht berechnet
+        self.neighbour_rows = np.full((0, self.k), -1, dtype=np.int32)
+        self.neighbour_scores = np.full((0, self.k), -np.inf, dtype=np.float32)
+        self.built_size = 0 # Anzahl Zeilen beim letzten vollständigen Aufbau
+        self.catalog_hash = None
+        self.dirty = False
+        self._buffers = {} # Attributname -> Puffer mit Reservezeilen; das Attribut ist eine Sicht darauf
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _term_frequencies(self, texts):
+        tf = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        n = SIMILARITY_NGRAM
+        for row, text in enumerate(texts):
+            padded = f" {' '.join(text.casefold().split())} "
+            grams = [padded[i:i + n] for i in range(max(1, len(padded) - n + 1))]
+            buckets = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint32, count=len(grams))
+            tf[row] = np.bincount(buckets % self.dimensions, minlength=self.dimensions)
+        np.log1p(tf, out=tf) # Sublineare TF-Gewichtung
+        return tf
+
+    def _vectors_for(self, tf):
+        vectors = tf * self.idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _top_k(self, scores, columns):
+        """Wählt je Zeile von scores die k besten Spalten, sortiert nach absteigender Ähnlichkeit."""
+        k = min(self.k, scores.shape[1])
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1)
+        rows = np.full((scores.shape[0], self.k), -1, dtype=np.int32)
+        best = np.full((scores.shape[0], self.k), -np.inf, dtype=np.float32)
+        rows[:, :k] = columns[np.take_along_axis(part, order, axis=1)]
+        best[:, :k] = np.take_along_axis(part_scores, order, axis=1)
+        rows[best == -np.inf] = -1
+        return rows, best
+
+    def _append_rows(self, name, rows):
+        """Hängt rows an das Array-Attribut name an. Die Kapazität wird bei Bedarf verdoppelt,
+        sodass nicht bei jedem add die gesamte n×d-Matrix kopiert wird."""
+        current = getattr(self, name)
+        n, m = current.shape[0], rows.shape[0]
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape[0] < n + m:
+            buffer = np.empty((max(n + m, 2 * n, 64),) + current.shape[1:], dtype=current.dtype)
+            buffer[:n] = current
+            self._buffers[name] = buffer
+        buffer[n:n + m] = rows
+        setattr(self, name, buffer[:n + m])
+
+    def _compute_vectors(self, texts):
+        """Normierte TF-IDF-Vektoren zu texts, blockweise berechnet (ohne zweite n×d-Matrix)."""
+        vectors = np.empty((len(texts), self.dimensions), dtype=np.float32)
+        for start in range(0, len(texts), self.BLOCK_SIZE):
+            stop = min(start + self.BLOCK_SIZE, len(texts))
+            vectors[start:stop] = self._vectors_for(self._term_frequencies(texts[start:stop]))
+        return vectors
+
+    def rebuild(self, texts):
+        """Baut den Index vollständig neu auf (blockweise, damit der Speicher begrenzt bleibt)."""
+        self._buffers = {}
+        self.texts = list(texts)
+        self.rows = {text.casefold(): row for row, text in enumerate(self.texts)}
+        n = len(self.texts)
+        df = np.zeros(self.dimensions, dtype=np.int64)
+        for start in range(0, n, self.BLOCK_SIZE):
+            df += np.count_nonzero(self._term_frequencies(self.texts[start:start + self.BLOCK_SIZE]), axis=0)
+        self.idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+        self.vectors = self._compute_vectors(self.texts)
+        self.neighbour_rows = np.full((n, self.k), -1, dtype=np.int32)
+        self.neighbour_scores = np.full((n, self.k), -np.inf, dtype=np.float32)
+        columns = np.arange(n, dtype=np.int32)
+        for start in range(0, n, self.BLOCK_SIZE):
+            stop = min(start + self.BLOCK_SIZE, n)
+            scores = self.vectors[start:stop] @ self.vectors.T
+            scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf # Nicht sich selbst
+            if n > 1:
+                self.neighbour_rows[start:stop], self.neighbour_scores[start:stop] = self._top_k(scores, columns)
+        self.built_size = n
+        self.dirty = True
+
+    def add(self, texts):
+        """Nimmt neue Einträge inkrementell auf: O(n·m) statt O(n²) für m neue Einträge."""
+        texts = [t for t in dict.fromkeys(texts) if t.casefold() not in self.rows]
+        if not texts:
+            return
+        if self.vectors is None: # Aus dem Cache geladen
+            self.vectors = self._compute_vectors(self.texts)
+        old_n, m = len(self.texts), len(texts)
+        new_vectors = self._vectors_for(self._term_frequencies(texts))
+        for offset, text in enumerate(texts):
+            self.rows[text.casefold()] = old_n + offset
+        self.texts.extend(texts)
+        self._append_rows("vectors", new_vectors)
+        n = old_n + m
+
+        scores = new_vectors @ self.vectors.T # m x n
+        scores[np.arange(m), np.arange(old_n, n)] = -np.inf
+        new_rows, new_scores = self._top_k(scores, np.arange(n, dtype=np.int32))
+        if old_n:
+            # Bestehende Top-k-Listen mit den Ähnlichkeiten zu den neuen Zeilen zusammenführen
+            merged_scores = np.hstack([self.neighbour_scores, scores[:, :old_n].T])
+            merged_rows = np.hstack([self.neighbour_rows, np.broadcast_to(np.arange(old_n, n, dtype=np.int32), (old_n, m))])
+            old_rows, old_scores = self._top_k(merged_scores, np.arange(merged_scores.shape[1], dtype=np.int32))
+            valid = old_rows >= 0
+            old_rows[valid] = np.take_along_axis(merged_rows, np.where(valid, old_rows, 0), axis=1)[valid]
+            self.neighbour_rows[:] = old_rows
+            self.neighbour_scores[:] = old_scores
+        self._append_rows("neighbour_rows", new_rows)
+        self._append_rows("neighbour_scores", new_scores)
+        self.dirty = True
+
+    def sync(self, catalog):
+        """Bringt den Index auf den Stand des Katalogs: unverändert -> nichts zu tun,
+        gewachsen -> inkrementell, stark verändert -> vollständiger Neuaufbau."""
+        content_hash = catalog_content_hash(catalog)
+        if content_hash == self.catalog_hash:
+            return
+        new_texts = [item for item in catalog if item.casefold() not in self.rows]
+        removed = len(self.rows) - (len(catalog) - len(new_texts))
+        if not self.rows or len(self.rows) + len(new_texts) > 2 * self.built_size or removed > len(self.rows) // 2:
+            self.rebuild(catalog)
+        else:
+            self.add(new_texts)
+        self.catalog_hash = content_hash
+        self.dirty = True
+
+    def similar(self, text):
+        """Gibt die vorberechneten Nachbarn eines Eintrags zurück (ähnlichste zuerst), O(k)."""
+        row = self.rows.get(text.casefold())
+        if row is None:
+            return []
+        return [self.texts[r] for r in self.neighbour_rows[row] if r >= 0]
+
+    def save(self, path):
+        meta = json.dumps({"catalog_hash": self.catalog_hash, "built_size": self.built_size,
+                           "texts": self.texts}, ensure_ascii=False).encode('utf-8')
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, meta=np.frombuffer(meta, dtype=np.uint8), idf=self.idf,
+                 neighbour_rows=self.neighbour_rows, neighbour_scores=self.neighbour_scores)
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].tobytes().decode('utf-8'))
+            index = cls(neighbours=data["neighbour_rows"].shape[1], dimensions=data["idf"].shape[0])
+            index.idf = data["idf"]
+            index.neighbour_rows = data["neighbour_rows"]
+            index.neighbour_scores = data["neighbour_scores"]
+        index.texts = meta["texts"]
+        index.rows = {text.casefold(): row for row, text in enumerate(index.texts)}
+        index.built_size = meta["built_size"]
+        index.catalog_hash = meta["catalog_hash"]
+        index.vectors = None
+        return index
+
+def load_similarity_index(catalog):
+    """Lädt den Ähnlichkeitsindex aus SIMILARITY_CACHE_FILE und gleicht ihn mit dem Katalog ab.
+    Gibt None zurück, wenn NumPy nicht installiert ist."""
+    if np is None:
+        print("Hinweis: NumPy ist nicht installiert, ähnliche Distraktoren sind nicht verfügbar.")
+        return None
+    index = None
+    if os.path.exists(SIMILARITY_CACHE_FILE):
+        try:
+            index = SimilarityIndex.load(SIMILARITY_CACHE_FILE)
+            if index.k != SIMILARITY_NEIGHBOURS or index.dimensions != SIMILARITY_DIMENSIONS:
+                index = None # Cache mit anderen Parametern erstellt
+        except Exception as e:
+            print(f"Warnung: {SIMILARITY_CACHE_FILE} konnte nicht gelesen werden ({e}). Index wird neu aufgebaut.")
+    if index is None:
+        index = SimilarityIndex()
+    index.sync(catalog)
+    save_similarity_index(index)
+    return index
+
+def save_similarity_index(index):
+    """Schreibt den Ähnlichkeitsindex in den Cache, falls er sich geändert hat."""
+    if index is None or not index.dirty:
+        return
+    try:
+        index.save(SIMILARITY_CACHE_FILE)
+    except Exception as e:
+        print(f"Fehler beim Speichern des Ähnlichkeitsindex in {SIMILARITY_CACHE_FILE}: {e}")
+
+def sample_similar_distractors(index, catalog, correct_answer, k=2, rng=None):
+    """Wählt k Distraktoren unter den nächsten Nachbarn der korrekten Antwort.
+    Fehlen passende Nachbarn, wird mit zufälligen Katalogeinträgen aufgefüllt."""
+    rng = rng or random
+    correct_key = correct_answer.casefold()
+    candidates = [text for text in index.similar(correct_answer)
+                  if text in catalog and text.casefold() != correct_key]
+    if len(candidates) >= k:
+        return rng.sample(candidates, k)
+    extra = sample_distractors(catalog, correct_answer, k + len(candidates), rng)
+    if extra is None:
+        return sample_distractors(catalog, correct_answer, k, rng)
+    chosen = candidates + [text for text in extra if text not in candidates]
+    return chosen[:k]
+
+# --- Volltextsuche ---
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text):
+    """Zerlegt einen Text in casefold-normalisierte Wort-Tokens."""
+    return _TOKEN_PATTERN.findall(text.casefold())
+
+class SearchIndex:
+    """Invertierter Token-Index über Katalogeinträge und Fragen.
+
+    Jedes Token verweist auf die Dokumente, in denen es vorkommt (mit Häufigkeit). Suchwörter
+    werden als Präfix behandelt, damit schon während des Tippens Treffer erscheinen; dafür
+    wird zusätzlich ein sortiertes Vokabular gepflegt. Alle Suchwörter müssen vorkommen,
+    sortiert wird nach TF-IDF.
+    """
+
+    def __init__(self):
+        self.documents = [] # (Art, Text), Art ist "catalog" oder "question"
+        self.postings = {} # Token -> {Dokument-ID: Häufigkeit}
+        self.vocabulary = [] # Sortierte Tokens für die Präfixsuche
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, kind, text, indexed_text=None):
+        """Nimmt ein Dokument auf; indexed_text erlaubt zusätzlichen Suchtext (z.B. die Antwort einer Frage)."""
+        doc_id = len(self.documents)
+        self.documents.append((kind, text))
+        for token in tokenize(indexed_text if indexed_text is not None else text):
+            docs = self.postings.get(token)
+            if docs is None:
+                docs = self.postings[token] = {}
+                bisect.insort(self.vocabulary, token)
+            docs[doc_id] = docs.get(doc_id, 0) + 1
+        return doc_id
+
+    def add_catalog_entry(self, answer):
+        return self.add("catalog", answer)
+
+    def add_question(self, question):
+        return self.add("question", question.question, f"{question.question} {question.correct_answer}")
+
+    def _expand_prefix(self, prefix):
+        """Alle Tokens mit diesem Präfix; das Vokabular ist sortiert, sie stehen also am Stück."""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\U0010ffff", start)
+        return self.vocabulary[start:end]
+
+    def search(self, query, limit=100):
+        """Gibt die Dokumente (Art, Text) zurück, die alle Suchwörter enthalten, bestes zuerst."""
+        words = tokenize(query)
+        if not words:
+            return []
+        n_docs = len(self.documents)
+        scores = None
+        for word in words:
+            word_scores = {}
+            for token in self._expand_prefix(word):
+                docs = self.postings[token]
+                idf = math.log((1 + n_docs) / (1 + len(docs))) + 1
+                for doc_id, count in docs.items():
+                    if scores is None or doc_id in scores:
+                        weight = (1 + math.log(count)) * idf
+                        if weight > word_scores.get(doc_id, 0.0):
+                            word_scores[doc_id] = weight
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {doc_id: score + word_scores[doc_id] for doc_id, score in scores.items() if doc_id in word_scores}
+            if not scores:
+                return []
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [self.documents[doc_id] for doc_id, _ in best]
+
+def build_search_index(catalog, questions):
+    """Baut den Suchindex aus Antwortkatalog und Fragen auf."""
+    index = SearchIndex()
+    for answer in catalog:
+        index.add_catalog_entry(answer)
+    for question in questions:
+        index.add_question(question)
+    return index
+
+# --- Beinahe-Duplikate (MinHash + LSH) ---
+# Texte werden ohne Leerraum und Satzzeichen in Zeichen-n-Gramme zerlegt (robust gegen
+# Umformulierungen und PDF-Leerzeichenfehler wie "Si e"). MinHash-Signaturen werden in Bänder
+# geteilt; nur Texte, die in mindestens einem Band übereinstimmen, werden verglichen.
+
+_MINHASH_PRIME = (1 << 31) - 1
+
+def _shorten(text, width=70):
+    """Einzeilige, auf width Zeichen gekürzte Darstellung für Meldungen und Berichte."""
+    text = " ".join(text.split())
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+class NearDuplicateIndex:
+    """MinHash-LSH-Index für Beinahe-Duplikate (benötigt NumPy).
+
+    Schlüssel sind beliebige Werte (z.B. Katalogtext oder Fragenposition). query() findet
+    ähnliche Einträge in O(Bänder + Kandidaten) statt O(n); clusters() gruppiert den ganzen Bestand.
+    """
+
+    def __init__(self, permutations=NEAR_DUPLICATE_PERMUTATIONS, bands=NEAR_DUPLICATE_BANDS,
+                 threshold=NEAR_DUPLICATE_THRESHOLD, shingle_size=NEAR_DUPLICATE_SHINGLE, seed=1):
+        if permutations % bands:
+            raise ValueError("permutations muss ein Vielfaches von bands sein")
+        self.rows = permutations // bands
+        self.bands = bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        generator = np.random.RandomState(seed) # Feste Permutationen, damit Signaturen vergleichbar bleiben
+        self._a = generator.randint(1, _MINHASH_PRIME, size=(permutations, 1)).astype(np.uint64)
+        self._b = generator.randint(0, _MINHASH_PRIME, size=(permutations, 1)).astype(np.uint64)
+        self.keys = []
+        self.signatures = []
+        self.buckets = [{} for _ in range(bands)] # Je Band: Bandinhalt -> Positionen in keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def signature(self, text):
+        """MinHash-Signatur eines Textes oder None, wenn er keine Wortzeichen enthält."""
+        compact = "".join(tokenize(text))
+        if not compact:
+            return None
+        n = self.shingle_size
+        shingles = {compact[i:i + n] for i in range(max(1, len(compact) - n + 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+        return ((self._a * hashes + self._b) % _MINHASH_PRIME).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+
+    def add(self, key, text):
+        signature = self.signature(text)
+        if signature is None:
+            return
+        position = len(self.keys)
+        self.keys.append(key)
+        self.signatures.append(signature)
+        for bucket, band_key in zip(self.buckets, self._band_keys(signature)):
+            bucket.setdefault(band_key, []).append(position)
+
+    def _candidates(self, signature):
+        candidates = set()
+        for bucket, band_key in zip(self.buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+        return candidates
+
+    def query(self, text, limit=5):
+        """Gibt bis zu limit (Schlüssel, geschätzte Jaccard-Ähnlichkeit) ab threshold zurück, ähnlichste zuerst."""
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        matches = []
+        for position in self._candidates(signature):
+            similarity = float(np.mean(self.signatures[position] == signature))
+            if similarity >= self.threshold:
+                matches.append((self.keys[position], similarity))
+        matches.sort(key=lambda match: -match[1])
+        return matches[:limit]
+
+    def clusters(self):
+        """Fasst alle Einträge, die paarweise über threshold liegen, zu Gruppen zusammen (Union-Find).
+        Gibt eine Liste von Gruppen (Listen von Schlüsseln, mindestens zwei) zurück, größte zuerst."""
+        parent = list(range(len(self.keys)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        checked = set()
+        for bucket in self.buckets:
+            for positions in bucket.values():
+                if len(positions) < 2:
+                    continue
+                for i, j in itertools.combinations(positions, 2):
+                    if (i, j) in checked:
+                        continue
+                    checked.add((i, j))
+                    if np.mean(self.signatures[i] == self.signatures[j]) >= self.threshold:
+                        parent[find(i)] = find(j)
+        groups = {}
+        for i in range(len(self.keys)):
+            groups.setdefault(find(i), []).append(self.keys[i])
+        return sorted((group for group in groups.values() if len(group) > 1), key=len, reverse=True)
+
+def build_near_duplicate_indexes(questions, catalog):
+    """Baut je einen Index über die Fragentexte (Schlüssel: Position) und den Antwortkatalog
+    (Schlüssel: Text). Gibt (None, None) zurück, wenn NumPy fehlt."""
+    if np is None:
+        return None, None
+    question_index = NearDuplicateIndex()
+    for position, question in enumerate(questions):
+        question_index.add(position, question.question)
+    answer_index = NearDuplicateIndex()
+    for answer in catalog:
+        answer_index.add(answer, answer)
+    return question_index, answer_index
+
+def run_duplicate_report():
+    """Kommandozeilen-Einstieg: listet Gruppen ähnlicher Fragen und Katalogantworten auf."""
+    if np is None:
+        print("Für die Duplikatsuche wird NumPy benötigt.")
+        return False
+    questions = load_questions()
+    catalog = load_answer_catalog()
+    question_index, answer_index = build_near_duplicate_indexes(questions, catalog)
+    question_clusters = question_index.clusters()
+    print(f"{len(question_clusters)} Gruppen ähnlicher Fragen (von {len(questions)}):")
+    for number, group in enumerate(question_clusters, 1):
+        print(f"\nGruppe {number}:")
+        for position in sorted(group):
+            print(f"  #{position + 1}: {_shorten(questions[position].question, 100)}")
+    answer_clusters = answer_index.clusters()
+    print(f"\n{len(answer_clusters)} Gruppen ähnlicher Katalogantworten (von {len(catalog)}):")
+    for number, group in enumerate(answer_clusters, 1):
+        print(f"\nGruppe {number}:")
+        for answer in group:
+            print(f"  {_shorten(answer, 100)}")
+    return True
+
+# --- Massenimport (PDF-Fragenkatalog, CSV, JSONL) ---
+# Alle Quellen werden zuerst vollständig gelesen, dann in einem Durchgang gegen den Bestand
+# dedupliziert und am Ende mit je einem Snapshot pro Datei geschrieben.
+
+class ImportSourceError(Exception):
+    """Eine Importquelle kann nicht gelesen werden (Format, fehlendes pypdf, ...)."""
+
+_PDF_QUESTION_START = re.compile(r"^(\d+)\.\s+(\S.*)$")
+_WHITESPACE = re.compile(r"\s+")
+
+def _extract_pdf_pages(path, start, stop):
+    """Extrahiert den Text der Seiten start bis stop-1. Läuft in einem Worker-Prozess."""
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+def extract_pdf_text(path, workers=None):
+    """Liest den Text aller PDF-Seiten; größere PDFs werden seitenweise auf einen Prozesspool verteilt."""
+    if PdfReader is None:
+        raise ImportSourceError("Für den PDF-Import wird das Paket 'pypdf' benötigt (pip install pypdf).")
+    try:
+        page_count = len(PdfReader(path).pages)
+    except Exception as e:
+        raise ImportSourceError(f"PDF {path} kann nicht gelesen werden: {e}")
+    workers = workers or os.cpu_count() or 1
+    chunks = max(1, min(workers, page_count // IMPORT_PDF_PAGES_PER_WORKER))
+    if chunks == 1:
+        return _extract_pdf_pages(path, 0, page_count)
+    bounds = [page_count * i // chunks for i in range(chunks + 1)]
+    # "spawn" statt fork: Die GUI ruft das aus einem Worker-Thread auf, während weitere Threads
+    # (SnapshotSaver, Indexaufbau) laufen und Sperren halten können
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(max_workers=chunks, mp_context=context) as pool:
+        futures = [pool.submit(_extract_pdf_pages, path, bounds[i], bounds[i + 1]) for i in range(chunks)]
+        return [text for future in futures for text in future.result()]
+
+def _ends_question(lines, start, max_lines=3):
+    """Prüft, ob ab lines[start] innerhalb weniger Zeilen (und vor der nächsten nummerierten Zeile)
+    eine Zeile auf "?" oder "!" endet."""
+    for offset, line in enumerate(lines[start:start + max_lines]):
+        line = line.strip()
+        if offset and _PDF_QUESTION_START.match(line):
+            return False
+        if line.endswith(("?", "!")):
+            return True
+    return False
+
+def parse_question_catalog_text(text):
+    """Zerlegt den Text des Fragenkatalogs ("1. Frage? Antwort ... 2. Frage? ...") in (Frage, Antwort)-Paare.
+
+    Eine Frage beginnt mit einer höheren Nummer als die vorige (oder mit 1 in einem neuen Kapitel)
+    und reicht bis zur ersten Zeile, die auf "?" oder "!" endet; alles danach bis zur nächsten
+    Frage ist die Antwort. Nummerierte Aufzählungen in Antworten werden dabei nicht als Frage
+    gewertet, weil sie eingerückt sind oder nicht in eine Frage münden.
+    """
+    lines = text.splitlines()
+    pairs = []
+    number = 0
+    question_lines = answer_lines = None
+    in_question = False
+
+    def finish():
+        if question_lines is None:
+            return
+        if not answer_lines and len(question_lines) > 1: # Frage ohne "?"/"!" am Ende
+            answer_lines.extend(question_lines[1:])
+            del question_lines[1:]
+        pairs.append((" ".join(question_lines), "\n".join(answer_lines)))
+
+    for i, raw_line in enumerate(lines):
+        line = _WHITESPACE.sub(" ", raw_line).strip()
+        if not line:
+            continue
+        match = _PDF_QUESTION_START.match(line)
+        if match:
+            found = int(match.group(1))
+            is_question = (found > number or found == 1) and _ends_question(lines, i)
+            if not is_question and found == number + 1 and not raw_line[:1].isspace():
+                is_question = True # Fortlaufende Nummer am Zeilenanfang, z.B. Arbeitsauftrag ohne "?"
+        if match and is_question:
+            finish()
+            number = found
+            question_lines, answer_lines = [match.group(2)], []
+            in_question = not line.endswith(("?", "!"))
+        elif question_lines is None:
+            continue # Text vor der ersten Frage (Titel, Kopfzeilen)
+        elif in_question:
+            question_lines.append(line)
+            in_question = not line.endswith(("?", "!"))
+        else:
+            answer_lines.append(line)
+    finish()
+    return pairs
+
+def _entry_pair(entry):
+    if not isinstance(entry, dict):
+        return None, None
+    return entry.get("question"), entry.get("correctAnswer")
+
+def read_csv_questions(path):
+    """Liest (Frage, Antwort)-Paare aus einer CSV-Datei (Trenner , ; oder Tab).
+    Mit Kopfzeile werden die Spalten "question" und "correctAnswer" verwendet, sonst die ersten beiden."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        sample = f.read(64 * 1024)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        rows = csv.reader(f, dialect)
+        header = next(rows, None)
+        if header is None:
+            return []
+        names = [name.strip().casefold() for name in header]
+        if "question" in names and "correctanswer" in names:
+            question_column, answer_column = names.index("question"), names.index("correctanswer")
+        else:
+            question_column, answer_column = 0, 1
+            rows = itertools.chain([header], rows)
+        width = max(question_column, answer_column)
+        return [(row[question_column], row[answer_column]) if len(row) > width else (None, None) for row in rows]
+
+def read_jsonl_questions(path):
+    """Liest (Frage, Antwort)-Paare aus einer JSONL-Datei mit einem Objekt wie in questions.json pro Zeile."""
+    pairs = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                pairs.append(_entry_pair(json.loads(line)))
+            except ValueError:
+                pairs.append((None, None))
+    return pairs
+
+def read_import_source(path, workers=None):
+    """Liest eine Importquelle anhand ihrer Dateiendung und gibt die rohen (Frage, Antwort)-Paare zurück."""
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        if extension == ".pdf":
+            return parse_question_catalog_text("\n".join(extract_pdf_text(path, workers)))
+        if extension == ".csv":
+            return read_csv_questions(path)
+        if extension == ".jsonl":
+            return read_jsonl_questions(path)
+        if extension == ".json":
+            return [_entry_pair(entry) for _, _, entry in iter_json_array(path)]
+    except (OSError, UnicodeDecodeError, csv.Error, ValueError) as e:
+        raise ImportSourceError(f"Fehler beim Lesen von {path}: {e}")
+    raise ImportSourceError(f"Nicht unterstütztes Dateiformat: {path} (erwartet .pdf, .csv, .jsonl oder .json)")
+
+def _question_key(text):
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+def read_import_sources(paths, workers=None):
+    """Liest alle Importquellen und gibt ihre rohen (Frage, Antwort)-Paare zusammen zurück.
+    Fasst den Bestand nicht an und kann daher in einem Worker-Thread laufen."""
+    pairs = []
+    for path in paths:
+        pairs.extend(read_import_source(path, workers))
+    return pairs
+
+def merge_import(pairs, questions, catalog):
+    """Übernimmt gelesene (Frage, Antwort)-Paare in questions und catalog (nur im Speicher).
+
+    Fragen, die es (bis auf Groß-/Kleinschreibung und Leerraum) schon gibt oder die im Import
+    mehrfach vorkommen, werden übersprungen; neue Antworten landen im Katalog. Gibt (neue Fragen,
+    neue Antworten, übersprungen) zurück; geschrieben wird erst mit commit_import.
+    """
+    seen = {_question_key(question.question) for question in questions}
+    answers = {}
+    added_questions, added_answers = [], []
+    skipped = 0
+    for question_text, answer_text in pairs:
+        if not isinstance(question_text, str) or not isinstance(answer_text, str):
+            skipped += 1
+            continue
+        question_text, answer_text = question_text.strip(), answer_text.strip()
+        key = _question_key(question_text)
+        if not key or not answer_text or key in seen:
+            skipped += 1
+            continue
+        seen.add(key)
+        answer_text = answers.setdefault(answer_text, answer_text)
+        question = Question(question_text, answer_text)
+        questions.append(question)
+        added_questions.append(question)
+        if catalog.add(answer_text):
+            added_answers.append(answer_text)
+    return added_questions, added_answers, skipped
+
+def import_questions(paths, questions, catalog, workers=None):
+    """Liest und übernimmt Fragen aus mehreren Quellen (siehe merge_import). Schlägt eine Quelle
+    fehl, bleibt der Bestand unverändert."""
+    return merge_import(read_import_sources(paths, workers), questions, catalog)
+
+def commit_import(questions, catalog, added_questions, added_answers, saver=None):
+    """Schreibt ein Importergebnis mit einem atomaren Snapshot je Datei statt eines Journaleintrags pro Frage.
+    Mit einem SnapshotSaver geschieht das im Hintergrund."""
+    for data_file, items, changed in ((QUESTIONS_FILE, questions, added_questions), (CATALOG_FILE, catalog, added_answers)):
+        if not changed:
+            continue
+        if saver is None:
+            compact_journal(data_file, items)
+        else:
+            saver.schedule(data_file, items)
 
-# ...existing code...
-
-# Hauptprogramm-Start ans Dateiende verschoben, damit alle Klassen bekannt sind
-if __name__ == '__main__':
-    print("Teste Lade-/Speicherfunktionen...")
-    current_questions = load_questions()
-    print(f"Geladene Fragen: {len(current_questions)}")
-    current_catalog = load_answer_catalog()
-    print(f"Geladener Katalog: {len(current_catalog)} Einträge. Beispiel: {current_catalog[:3]}")
-
-    print("\n--- Werkstoffquiz GUI wird hier starten ---")
-    root = tk.Tk()
-    app = WerkstoffquizApp(root)
-    root.mainloop()
-
-
-import tkinter as tk
-from tkinter import messagebox
+def run_import(paths, workers=None):
+    """Kommandozeilen-Einstieg: importiert die Dateien in die Datendateien und gibt eine Übersicht aus."""
+    questions = load_questions()
+    catalog = load_answer_catalog()
+    try:
+        added_questions, added_answers, skipped = import_questions(paths, questions, catalog, workers)
+    except ImportSourceError as e:
+        print(e)
+        return False
+    commit_import(questions, catalog, added_questions, added_answers)
+    print(f"{len(added_questions)} Fragen und {len(added_answers)} Katalogantworten importiert, "
+          f"{skipped} Einträge übersprungen (Duplikate oder unvollständig).")
+    return True
+
+
+# --- Antwortprotokoll und Auswertung ---
+# Jede Antwort wird als Datensatz fester Länge an ANSWER_LOG_FILE angehängt. Die Auswertung
+# merkt sich, bis zu welchem Byte sie das Protokoll schon verarbeitet hat, und liest danach
+# nur noch neue Datensätze.
+
+ANSWER_LOG_MAGIC = b"WQEV"
+ANSWER_LOG_VERSION = 1
+_ANSWER_LOG_HEADER = struct.Struct("<4sHH") # Magic, Version, Datensatzlänge
+_ANSWER_EVENT = struct.Struct("<dIIQBf") # Zeit, Sitzung, Frage, Antwort-Hash, richtig, Antwortzeit (s)
+
+def answer_hash(text):
+    """64-Bit-Kennung einer Antwort (unabhängig von Groß-/Kleinschreibung wie im Katalog)."""
+    return int.from_bytes(hashlib.blake2b(text.casefold().encode('utf-8'), digest_size=8).digest(), 'little')
+
+def new_session_id(name=None):
+    """32-Bit-Sitzungskennung; aus einem Namen (z.B. Server-Sitzung) abgeleitet oder zufällig."""
+    if name is None:
+        return secrets.randbits(32)
+    return zlib.crc32(name.encode('utf-8'))
+
+class AnswerEventLog:
+    """Nur anhängendes Binärprotokoll der gegebenen Antworten."""
+
+    def __init__(self, path=ANSWER_LOG_FILE):
+        self.path = path
+        self._file = None
+        self._disabled = False
+
+    def _open(self):
+        f = open(self.path, 'a+b')
+        f.seek(0)
+        header = f.read(_ANSWER_LOG_HEADER.size)
+        if not header:
+            f.write(_ANSWER_LOG_HEADER.pack(ANSWER_LOG_MAGIC, ANSWER_LOG_VERSION, _ANSWER_EVENT.size))
+        elif header != _ANSWER_LOG_HEADER.pack(ANSWER_LOG_MAGIC, ANSWER_LOG_VERSION, _ANSWER_EVENT.size):
+            f.close()
+            raise ValueError(f"{self.path} ist kein Antwortprotokoll dieser Version")
+        else:
+            size = f.seek(0, os.SEEK_END)
+            torn = (size - _ANSWER_LOG_HEADER.size) % _ANSWER_EVENT.size
+            if torn: # Unvollständigen letzten Datensatz eines Absturzes verwerfen
+                f.truncate(size - torn)
+        return f
+
+    def record(self, session, question_index, answer, is_correct, latency):
+        if self._disabled:
+            return
+        try:
+            if self._file is None:
+                self._file = self._open()
+            self._file.write(_ANSWER_EVENT.pack(time.time(), session, question_index, answer_hash("" if answer is None else str(answer)),
+                                                bool(is_correct), latency))
+            self._file.flush()
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Antwortprotokoll deaktiviert: {e}")
+            self._disabled = True
+            self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class AnswerStatistics:
+    """Inkrementell fortgeschriebene Kennzahlen aus dem Antwortprotokoll (benötigt NumPy).
+
+    Je Frage: Versuche, richtige Antworten, Summe der Antwortzeiten. Je (Frage, falsche Antwort):
+    wie oft dieser Distraktor gewählt wurde. Je Sitzung: Versuche, richtige Antworten, letzte Antwort.
+    """
+
+    def __init__(self):
+        self.offset = _ANSWER_LOG_HEADER.size # Bis hierhin ist das Protokoll verarbeitet
+        self.question_attempts = np.zeros(0, dtype=np.int64)
+        self.question_correct = np.zeros(0, dtype=np.int64)
+        self.question_latency = np.zeros(0, dtype=np.float64)
+        self.confusion_question = np.zeros(0, dtype=np.uint32)
+        self.confusion_answer = np.zeros(0, dtype=np.uint64)
+        self.confusion_count = np.zeros(0, dtype=np.int64)
+        self.session_ids = np.zeros(0, dtype=np.uint32)
+        self.session_attempts = np.zeros(0, dtype=np.int64)
+        self.session_correct = np.zeros(0, dtype=np.int64)
+        self.session_last = np.zeros(0, dtype=np.float64)
+
+    def update(self, log_path=ANSWER_LOG_FILE):
+        """Verarbeitet alle seit dem letzten Aufruf angehängten Datensätze. Gibt deren Anzahl zurück."""
+        if not os.path.exists(log_path):
+            return 0
+        with open(log_path, 'rb') as f:
+            header = f.read(_ANSWER_LOG_HEADER.size)
+            size = os.fstat(f.fileno()).st_size
+        if header != _ANSWER_LOG_HEADER.pack(ANSWER_LOG_MAGIC, ANSWER_LOG_VERSION, _ANSWER_EVENT.size):
+            raise ValueError(f"{log_path} ist kein Antwortprotokoll dieser Version")
+        if size < self.offset: # Protokoll wurde neu angelegt
+            self.__init__()
+        count = (size - self.offset) // _ANSWER_EVENT.size
+        if count <= 0:
+            return 0
+        dtype = np.dtype([("time", "<f8"), ("session", "<u4"), ("question", "<u4"),
+                          ("answer", "<u8"), ("correct", "u1"), ("latency", "<f4")]) # Wie _ANSWER_EVENT
+        events = np.fromfile(log_path, dtype=dtype, count=count, offset=self.offset)
+        self._add_events(events)
+        self.offset += count * _ANSWER_EVENT.size
+        return count
+
+    def _add_events(self, events):
+        questions = events["question"].astype(np.int64)
+        correct = events["correct"].astype(np.int64)
+        length = max(len(self.question_attempts), int(questions.max()) + 1)
+        self.question_attempts = self._grow(self.question_attempts, length) + np.bincount(questions, minlength=length)
+        self.question_correct = self._grow(self.question_correct, length) + np.bincount(questions, correct, length).astype(np.int64)
+        self.question_latency = self._grow(self.question_latency, length) + np.bincount(questions, events["latency"], length)
+
+        wrong = events[events["correct"] == 0]
+        keys = np.empty(len(self.confusion_count) + len(wrong), dtype=[("question", "<u4"), ("answer", "<u8")])
+        keys["question"] = np.concatenate([self.confusion_question, wrong["question"]])
+        keys["answer"] = np.concatenate([self.confusion_answer, wrong["answer"]])
+        weights = np.concatenate([self.confusion_count, np.ones(len(wrong), dtype=np.int64)])
+        unique, inverse = np.unique(keys, return_inverse=True)
+        self.confusion_question = unique["question"].copy()
+        self.confusion_answer = unique["answer"].copy()
+        self.confusion_count = np.bincount(inverse.ravel(), weights, len(unique)).astype(np.int64)
+
+        sessions = np.concatenate([self.session_ids, events["session"]])
+        unique, inverse = np.unique(sessions, return_inverse=True)
+        inverse = inverse.ravel()
+        attempts = np.concatenate([self.session_attempts, np.ones(len(events), dtype=np.int64)])
+        session_correct = np.concatenate([self.session_correct, correct])
+        last = np.zeros(len(unique))
+        np.maximum.at(last, inverse, np.concatenate([self.session_last, events["time"]]))
+        self.session_ids = unique
+        self.session_attempts = np.bincount(inverse, attempts, len(unique)).astype(np.int64)
+        self.session_correct = np.bincount(inverse, session_correct, len(unique)).astype(np.int64)
+        self.session_last = last
+
+    @staticmethod
+    def _grow(values, length):
+        if len(values) >= length:
+            return values
+        return np.concatenate([values, np.zeros(length - len(values), dtype=values.dtype)])
+
+    FIELDS = ("question_attempts", "question_correct", "question_latency", "confusion_question",
+              "confusion_answer", "confusion_count", "session_ids", "session_attempts",
+              "session_correct", "session_last")
+
+    def save(self, path=ANSWER_STATS_FILE):
+        try:
+            tmp_path = path + ".tmp.npz"
+            np.savez(tmp_path, offset=np.array([self.offset], dtype=np.int64),
+                     **{name: getattr(self, name) for name in self.FIELDS})
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Fehler beim Speichern der Antwortstatistik {path}: {e}")
+
+    @classmethod
+    def load(cls, path=ANSWER_STATS_FILE):
+        """Lädt den gespeicherten Stand oder beginnt leer, wenn keiner (lesbar) vorhanden ist."""
+        stats = cls()
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    offset = int(data["offset"][0])
+                    values = {name: data[name] for name in cls.FIELDS}
+                stats.offset = offset
+                for name, value in values.items():
+                    setattr(stats, name, value)
+            except Exception as e:
+                print(f"Antwortstatistik {path} nicht lesbar ({e}), werte das Protokoll neu aus.")
+                stats = cls()
+        return stats
+
+    def report(self, questions, catalog, limit=10, min_attempts=3):
+        """Schwierigste Fragen, häufigste Verwechslungen und Trefferquote je Sitzung als dict."""
+        names = {answer_hash(text): text for text in catalog}
+        for question in questions:
+            names.setdefault(answer_hash(question.correct_answer), question.correct_answer)
+
+        def question_text(index):
+            return questions[index].question if index < len(questions) else f"Frage #{index} (gelöscht)"
+
+        attempts = self.question_attempts
+        answered = np.flatnonzero(attempts >= min_attempts)
+        accuracy = self.question_correct[answered] / attempts[answered]
+        hardest = answered[np.argsort(accuracy, kind="stable")[:limit]]
+
+        confusion_attempts = attempts[self.confusion_question.astype(np.int64)] if len(attempts) else np.zeros(0)
+        eligible = np.flatnonzero(confusion_attempts >= min_attempts)
+        rates = self.confusion_count[eligible] / confusion_attempts[eligible]
+        confused = eligible[np.argsort(-rates, kind="stable")[:limit]]
+
+        recent = np.argsort(-self.session_last, kind="stable")[:limit]
+        total_attempts = int(self.session_attempts.sum())
+        return {
+            "answers": total_attempts,
+            "accuracy": int(self.session_correct.sum()) / total_attempts if total_attempts else None,
+            "hardest_questions": [
+                {"question": question_text(int(i)), "attempts": int(attempts[i]),
+                 "accuracy": float(self.question_correct[i] / attempts[i]),
+                 "mean_latency": float(self.question_latency[i] / attempts[i])} for i in hardest],
+            "confusions": [
+                {"question": question_text(int(self.confusion_question[i])),
+                 "answer": names.get(int(self.confusion_answer[i]), f"#{int(self.confusion_answer[i]):016x}"),
+                 "rate": float(self.confusion_count[i] / confusion_attempts[i]),
+                 "count": int(self.confusion_count[i])} for i in confused],
+            "sessions": len(self.session_ids),
+            "recent_sessions": [
+                {"session": f"{int(self.session_ids[i]):08x}",
+                 "last_answer": time.strftime("%Y-%m-%d %H:%M", time.localtime(self.session_last[i])),
+                 "attempts": int(self.session_attempts[i]),
+                 "accuracy": float(self.session_correct[i] / self.session_attempts[i])} for i in recent],
+        }
+
+def run_analytics(limit=10, min_attempts=3):
+    """Kommandozeilen-Einstieg: schreibt die Statistik fort und gibt die Auswertung aus."""
+    if np is None:
+        print("Für die Auswertung des Antwortprotokolls wird NumPy benötigt.")
+        return False
+    stats = AnswerStatistics.load()
+    try:
+        new_events = stats.update()
+    except (OSError, ValueError) as e:
+        print(f"Fehler beim Lesen von {ANSWER_LOG_FILE}: {e}")
+        return False
+    stats.save()
+    report = stats.report(load_questions(), load_answer_catalog(), limit, min_attempts)
+    print(f"{new_events} neue Antworten ausgewertet, insgesamt {report['answers']} in {report['sessions']} Sitzungen.")
+    if report["accuracy"] is not None:
+        print(f"Trefferquote gesamt: {report['accuracy']:.0%}")
+    print(f"\nSchwierigste Fragen (ab {min_attempts} Versuchen):")
+    for entry in report["hardest_questions"]:
+        print(f"  {entry['accuracy']:4.0%} von {entry['attempts']:>4}, Ø {entry['mean_latency']:5.1f} s  "
+              f"{_shorten(entry['question'])}")
+    print("\nHäufigste Verwechslungen (Anteil der Antworten auf die Frage):")
+    for entry in report["confusions"]:
+        print(f"  {entry['rate']:4.0%} ({entry['count']:>3}x)  {_shorten(entry['question'], 45)}  ->  "
+              f"{_shorten(entry['answer'], 40)}")
+    print("\nLetzte Sitzungen:")
+    for entry in report["recent_sessions"]:
+        print(f"  {entry['last_answer']}  {entry['session']}  {entry['accuracy']:4.0%} von {entry['attempts']}")
+    return True
+
+# --- Quiz-Logik ohne Oberfläche ---
+
+class QuizUnavailable(Exception):
+    """Es kann keine Runde erzeugt werden (keine Fragen, zu kleiner Katalog, ...)."""
+
+class QuizRound:
+    """Eine Quizrunde: Frage, korrekte Antwort und gemischte Antwortmöglichkeiten."""
+    __slots__ = ("question_index", "question", "correct_answer", "options")
+
+    def __init__(self, question_index, question, correct_answer, options):
+        self.question_index = question_index
+        self.question = question
+        self.correct_answer = correct_answer
+        self.options = options
+
+    def is_correct(self, answer):
+        return answer == self.correct_answer
+
+    def to_dict(self):
+        return {"question": self.question, "correctAnswer": self.correct_answer, "options": list(self.options)}
+
+class QuizEngine:
+    """UI-unabhängiger Kern des Quiz: Fragenauswahl, Distraktoren und Auswertung.
+
+    Arbeitet direkt auf den (geteilten) Fragen- und Katalogobjekten der Anwendung, sodass
+    über die Dialoge hinzugefügte Einträge ohne weiteres Zutun berücksichtigt werden.
+    """
+
+    def __init__(self, questions, catalog, rng=None, scheduler=None, distractor_count=2):
+        self.questions = questions
+        self.catalog = catalog
+        self.rng = rng or random.Random()
+        # Fragenauswahl: QuestionDeck oder SpacedRepetitionScheduler (draw/grow/record)
+        self.scheduler = scheduler if scheduler is not None else QuestionDeck(len(questions), rng=self.rng)
+        self.scheduler.rng = self.rng
+        self.distractor_count = distractor_count
+        self.similarity_index = None
+        self.use_similar_distractors = False
+        self.current_round = None
+        self.last_round = None # Zuletzt beantwortete Runde, z.B. um die Lösung anzuzeigen
+        self.answered = 0
+        self.answered_correctly = 0
+        self.event_log = None # AnswerEventLog, in das jede Antwort geschrieben wird
+        self.session_id = 0
+        self._round_started = 0.0
+
+    def unavailable_reason(self):
+        """Gibt einen Hinweistext zurück, wenn aktuell keine Runde möglich ist, sonst None."""
+        if not self.questions:
+            return "Keine Fragen vorhanden. Bitte fügen Sie Fragen hinzu."
+        # Mindestens 2 Distraktoren für 3 Antwortmöglichkeiten (1 korrekte + 2 falsche)
+        if len(self.catalog) < self.distractor_count:
+            return f"Antwortkatalog hat zu wenige Einträge (<{self.distractor_count}). Bitte ergänzen."
+        return None
+
+    def _choose_distractors(self, correct_answer):
+        if self.use_similar_distractors and self.similarity_index is not None:
+            return sample_similar_distractors(self.similarity_index, self.catalog, correct_answer,
+                                              self.distractor_count, self.rng)
+        return sample_distractors(self.catalog, correct_answer, self.distractor_count, self.rng)
+
+    def _make_round(self, scheduler):
+        index = scheduler.draw()
+        question_data = self.questions[index]
+        correct_answer = question_data.correct_answer
+        options = self._choose_distractors(correct_answer)
+        if options is None:
+            raise QuizUnavailable(f"Nicht genug Distraktoren für Frage: '{question_data.question}'. Katalog erweitern.")
+        options.append(correct_answer)
+        self.rng.shuffle(options) # Antworten mischen
+        return QuizRound(index, question_data.question, correct_answer, options)
+
+    @profiled
+    def next_round(self):
+        """Zieht die nächste Frage und stellt die Antwortmöglichkeiten zusammen.
+        Wirft QuizUnavailable mit einem Hinweistext, wenn das nicht möglich ist."""
+        reason = self.unavailable_reason()
+        if reason:
+            raise QuizUnavailable(reason)
+        self.scheduler.grow(len(self.questions)) # Inzwischen hinzugefügte Fragen aufnehmen
+        self.current_round = self._make_round(self.scheduler)
+        self._round_started = time.monotonic()
+        return self.current_round
+
+    @profiled
+    def check(self, answer):
+        """Wertet eine Antwort auf die aktuelle Runde aus und beendet sie; eine zweite Antwort
+        auf dieselbe Runde wirft QuizUnavailable."""
+        if self.current_round is None:
+            raise QuizUnavailable("Es läuft keine Runde.")
+        is_correct = self.current_round.is_correct(answer)
+        self.scheduler.record(self.current_round.question_index, is_correct)
+        if self.event_log is not None:
+            self.event_log.record(self.session_id, self.current_round.question_index, answer, is_correct,
+                                  time.monotonic() - self._round_started)
+        self.answered += 1
+        self.answered_correctly += is_correct
+        self.last_round, self.current_round = self.current_round, None
+        return is_correct
+
+    def generate_rounds(self, n):
+        """Erzeugt n fertig gemischte Runden in einem Durchlauf, z.B. für gedruckte Prüfungen.
+        Fragen werden dabei ohne Wiederholung aus einem eigenen Stapel gezogen, solange er reicht;
+        Stapel bzw. Wiederholungsplan des Lernenden bleiben unverändert.
+        Runden, für die es nicht genug Distraktoren gibt, werden übersprungen."""
+        reason = self.unavailable_reason()
+        if reason:
+            raise QuizUnavailable(reason)
+        make_round = functools.partial(self._make_round, QuestionDeck(len(self.questions), rng=self.rng))
+        rounds = []
+        append = rounds.append
+        skipped = 0
+        while len(rounds) < n:
+            try:
+                append(make_round())
+            except QuizUnavailable:
+                skipped += 1
+                if skipped > n + len(self.questions): # Kein Fortschritt mehr möglich
+                    break
+        return rounds
+
+# --- HTTP/JSON-Server ---
+# Stellt dieselbe Quiz-Logik (QuizEngine) für die Weboberfläche (index.html/script.js) bereit.
+# Die Daten werden einmal geladen; jede Sitzung hat ihren eigenen Fragenstapel.
+
+class BadRequest(Exception):
+    """Ungültige Anfrage an den Server (wird mit Status 400 beantwortet)."""
+
+
+def _string_field(data, name, default=None):
+    """Liest ein optionales Textfeld aus dem JSON-Inhalt; andere Typen sind ein BadRequest."""
+    value = data.get(name, default)
+    if value is not None and not isinstance(value, str):
+        raise BadRequest(f"Feld '{name}' muss ein Text sein.")
+    return value
+
+
+class UnknownSession(Exception):
+    """Die Sitzung existiert nicht (nie angelegt oder bereits verworfen); wird mit 404 beantwortet."""
+
+
+class QuizServer:
+    """Minimaler asyncio-HTTP/1.1-Server (Keep-Alive, JSON) ohne zusätzliche Abhängigkeiten.
+
+    Endpunkte:
+      GET  /, /script.js, /style.css   Weboberfläche
+      GET  /api/data                   Alle Fragen und der Antwortkatalog
+      POST /api/session                Neue Sitzung -> {"session": id}
+      GET  /api/round?session=id       Nächste Runde (ohne Lösung); unbekannte Sitzung -> 404
+      POST /api/check                  {"session", "answer"} -> {"correct", "correctAnswer"}
+      POST /api/questions              {"question", "correctAnswer"} -> Frage hinzufügen
+      POST /api/catalog                {"answer"} -> Antwort zum Katalog hinzufügen
+    """
+
+    STATIC_FILES = {"/": ("index.html", "text/html"), "/index.html": ("index.html", "text/html"),
+                    "/script.js": ("script.js", "application/javascript"), "/style.css": ("style.css", "text/css")}
+    REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+    def __init__(self, questions, catalog, static_dir=None):
+        self.questions = questions
+        self.catalog = catalog
+        self.sessions = collections.OrderedDict() # Sitzungs-ID -> QuizEngine, älteste zuerst
+        self._data_payload = None # Zwischengespeicherte Antwort für /api/data
+        self.event_log = AnswerEventLog()
+        self.saver = SnapshotSaver()
+        # Journal-Einträge werden der Reihe nach in einem eigenen Thread geschrieben (fsync),
+        # damit eine Änderung nicht alle anderen Sitzungen in der Ereignisschleife aufhält
+        self.journal_writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="werkstoffquiz-journal")
+        self._pending_write = None # Schreibauftrag der zuletzt bearbeiteten Anfrage
+        self.static = {}
+        static_dir = static_dir or os.path.dirname(os.path.abspath(__file__))
+        for route, (name, content_type) in self.STATIC_FILES.items():
+            path = os.path.join(static_dir, name)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    self.static[route] = (content_type + "; charset=utf-8", f.read())
+
+    def new_session(self):
+        """Legt eine Sitzung mit eigenem Fragenstapel an und gibt (ID, Engine) zurück."""
+        session_id = secrets.token_hex(8)
+        engine = QuizEngine(self.questions, self.catalog)
+        engine.event_log = self.event_log
+        engine.session_id = new_session_id(session_id)
+        self.sessions[session_id] = engine
+        if len(self.sessions) > SERVER_SESSION_LIMIT:
+            self.sessions.popitem(last=False) # Am längsten ungenutzte Sitzung verwerfen
+        return session_id, engine
+
+    def session(self, session_id):
+        """Gibt die Engine einer bestehenden Sitzung zurück. Neue Sitzungen entstehen nur über
+        POST /api/session, sonst könnte jede beliebige ID einen Fragenstapel anlegen."""
+        engine = self.sessions.get(session_id) if session_id else None
+        if engine is None:
+            raise UnknownSession("Unbekannte Sitzung. Bitte eine neue Sitzung anlegen.")
+        self.sessions.move_to_end(session_id)
+        return session_id, engine
+
+    @profiled
+    def dispatch(self, method, target, body):
+        """Bearbeitet eine Anfrage und gibt (Status, Content-Type, Inhalt) zurück."""
+        url = urllib.parse.urlsplit(target)
+        if url.path in self.static:
+            if method != "GET":
+                return self._json(405, {"error": "Nur GET erlaubt."})
+            content_type, payload = self.static[url.path]
+            return 200, content_type, payload
+        query = urllib.parse.parse_qs(url.query)
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return self._json(400, {"error": "Ungültiges JSON."})
+        if not isinstance(data, dict):
+            return self._json(400, {"error": "JSON-Objekt erwartet."})
+        route = (method, url.path)
+        try:
+            if route == ("GET", "/api/data"):
+                if self._data_payload is None:
+                    self._data_payload = json.dumps({"questions": list(self.questions), "catalog": list(self.catalog)},
+                                                    ensure_ascii=False, default=_json_default).encode('utf-8')
+                return 200, "application/json; charset=utf-8", self._data_payload
+            if route == ("POST", "/api/session"):
+                session_id, _ = self.new_session()
+                return self._json(200, {"session": session_id})
+            if route == ("GET", "/api/round"):
+                session_id, engine = self.session(query.get("session", [None])[0])
+                quiz_round = engine.next_round()
+                return self._json(200, {"session": session_id, "question": quiz_round.question,
+                                        "options": quiz_round.options})
+            if route == ("POST", "/api/check"):
+                answer = _string_field(data, "answer")
+                session_id, engine = self.session(_string_field(data, "session"))
+                is_correct = engine.check(answer)
+                return self._json(200, {"session": session_id, "correct": is_correct,
+                                        "correctAnswer": engine.last_round.correct_answer})
+            if route == ("POST", "/api/questions"):
+                return self._add_question(data)
+            if route == ("POST", "/api/catalog"):
+                return self._add_catalog_entry(data)
+        except BadRequest as e:
+            return self._json(400, {"error": str(e)})
+        except UnknownSession as e:
+            return self._json(404, {"error": str(e)})
+        except QuizUnavailable as e:
+            return self._json(409, {"error": str(e)})
+        if url.path.startswith("/api/"):
+            return self._json(404, {"error": "Unbekannter Endpunkt."})
+        return self._json(404, {"error": "Nicht gefunden."})
+
+    def _add_question(self, data):
+        question_text = (_string_field(data, "question") or "").strip()
+        correct_answer_text = (_string_field(data, "correctAnswer") or "").strip()
+        if not question_text or not correct_answer_text:
+            return self._json(400, {"error": "Frage und korrekte Antwort dürfen nicht leer sein."})
+        question = Question(question_text, correct_answer_text)
+        self.questions.append(question)
+        added_answers = [correct_answer_text] if self.catalog.add(correct_answer_text) else []
+        self._record_changes([question], added_answers)
+        return self._json(200, {"question": question.to_dict()})
+
+    def _add_catalog_entry(self, data):
+        answer = (_string_field(data, "answer") or "").strip()
+        if not answer:
+            return self._json(400, {"error": "Antwort darf nicht leer sein."})
+        if not self.catalog.add(answer):
+            return self._json(409, {"error": "Diese Antwort ist bereits im Katalog vorhanden."})
+        self._record_changes([], [answer])
+        return self._json(200, {"answer": answer})
+
+    def _record_changes(self, added_questions, added_answers):
+        """Persistiert Änderungen wie WerkstoffquizApp.record_changes (Journal oder Snapshot).
+        Die Journal-Einträge schreibt journal_writer; handle_connection antwortet erst danach."""
+        self._data_payload = None
+        if not USE_JOURNAL:
+            self.saver.schedule(QUESTIONS_FILE, self.questions)
+            self.saver.schedule(CATALOG_FILE, self.catalog)
+            return
+        # Ein Snapshot für die Kompaktierung muss genau zu den bis hierhin eingereihten Einträgen
+        # passen, also jetzt kopiert werden; das lohnt sich aber erst nahe der Schwelle
+        snapshots = [(data_file, list(items)) for data_file, items in ((QUESTIONS_FILE, self.questions),
+                                                                       (CATALOG_FILE, self.catalog))
+                     if _journal_lengths.get(data_file, 0) >= JOURNAL_COMPACT_THRESHOLD - 1
+                     and not self.saver.is_pending(data_file)]
+
+        def write():
+            for question in added_questions:
+                append_journal(QUESTIONS_FILE, "add", question)
+            for answer in added_answers:
+                append_journal(CATALOG_FILE, "add", answer)
+            for data_file, snapshot in snapshots:
+                compact_journal_if_needed(data_file, snapshot, saver=self.saver)
+
+        self._pending_write = self.journal_writer.submit(write)
+
+    def _json(self, status, obj):
+        return status, "application/json; charset=utf-8", json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+    async def handle_connection(self, reader, writer):
+        """Liest Anfragen einer (Keep-Alive-)Verbindung, bis der Client sie schließt."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if length > SERVER_MAX_BODY:
+                    status, content_type, payload = self._json(413, {"error": "Anfrage zu groß."})
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, content_type, payload = self.dispatch(method, target, body)
+                        write, self._pending_write = self._pending_write, None
+                        if write is not None: # Antworten, sobald die Änderung im Journal steht
+                            await asyncio.wrap_future(write)
+                    except Exception as e: # Fehler im Handler: antworten statt die Verbindung abzubrechen
+                        print(f"Fehler bei {method} {target}: {e!r}", file=sys.stderr)
+                        status, content_type, payload = self._json(500, {"error": "Interner Serverfehler."})
+                    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write((f"HTTP/1.1 {status} {self.REASONS.get(status, '')}\r\n"
+                              f"Content-Type: {content_type}\r\n"
+                              f"Content-Length: {len(payload)}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode('latin-1') + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Werkstoffquiz-Server läuft auf http://{host}:{port}/ "
+              f"({len(self.questions)} Fragen, {len(self.catalog)} Katalogeinträge)")
+        async with server:
+            await server.serve_forever()
+
+def run_server(host=SERVER_HOST, port=SERVER_PORT):
+    """Lädt die Daten einmal und startet den HTTP/JSON-Server (blockiert bis Strg+C)."""
+    questions = load_questions()
+    catalog = load_answer_catalog()
+    server = QuizServer(questions, catalog)
+    try:
+        asyncio.run(server.serve(host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.journal_writer.shutdown(wait=True) # Eingereihte Journal-Einträge zuerst
+        server.saver.close() # Ausstehende Hintergrund-Schreibvorgänge abschließen
+        compact_journal_if_needed(QUESTIONS_FILE, questions, threshold=1)
+        compact_journal_if_needed(CATALOG_FILE, catalog, threshold=1)
+        server.event_log.close()
+        dump_profile()
+        print("Server beendet.")
 
-# ...existing code...
 
 class WerkstoffquizApp:
-    def __init__(self, root_tk):
+    def __init__(self, root_tk, background_loading=BACKGROUND_LOADING):
         self.root = root_tk
         self.root.title("Werkstoffquiz")
         self.root.geometry("600x450") # Startgröße
 
-        # Daten laden
-        self.questions = load_questions()
-        self.answer_catalog = load_answer_catalog()
-        print(f"App gestartet: {len(self.questions)} Fragen, {len(self.answer_catalog)} Katalogeinträge geladen.")
+        # Daten werden erst nach dem Aufbau des Fensters geladen (siehe _start_loading)
+        self.questions = []
+        self.answer_catalog = AnswerCatalog()
+        self.rng = random.Random() # Eigener Zufallsgenerator, für Tests mit Seed ersetzbar
+        self.engine = None
+        self._draws_since_deck_save = 0
+        self._deck = None # Fragenstapel bleibt beim Wechsel zu Leitner im Speicher (die Sicherung läuft asynchron)
+        self.search_index = None # Nach dem Laden im Hintergrund aufgebaut
+        self.saver = SnapshotSaver() # Schreibt Snapshots im Hintergrund statt im Tk-Thread
+        self.question_duplicates = None # Beinahe-Duplikat-Indizes, nach dem Laden im Hintergrund aufgebaut
+        self.answer_duplicates = None
+        self._similarity_busy = False # Ähnlichkeitsindex wird gerade im Hintergrund geladen/abgeglichen
+        self._similarity_stale = False # Katalog hat sich währenddessen erneut geändert
 
         # --- UI Elemente ---
         # Frame für Frage
         self.question_frame = tk.Frame(self.root, pady=10)
         self.question_frame.pack(fill="x")
-        self.question_label = tk.Label(self.question_frame, text="Frage wird hier angezeigt...", font=("Arial", 14), wraplength=550)
+        self.question_label = tk.Label(self.question_frame, text="Daten werden geladen...", font=("Arial", 14), wraplength=550)
         self.question_label.pack()
 
         # Frame für Antwort-Buttons
@@ -145,23 +2574,13 @@ class WerkstoffquizApp:
                 font=("Arial", 12),
                 anchor="center",
                 justify="center",
-                wraplength=1  # Wird später dynamisch gesetzt
+                wraplength=1,  # Wird später dynamisch gesetzt
+                state=tk.DISABLED # Bis die Daten geladen sind
             )
             button.pack(fill="x", expand=True)
             self.answer_buttons.append(button)
             self.button_frames.append(btn_frame)
 
-        # Fenster-Resize-Event binden, um wraplength der Buttons dynamisch zu setzen
-        self.root.bind("<Configure>", self._update_button_wraplength)
-
-    def _update_button_wraplength(self, event=None):
-        # Setzt wraplength der Buttons auf die aktuelle Breite des answer_buttons_frame (abzgl. Padding)
-        frame_width = self.answer_buttons_frame.winfo_width()
-        wrap = max(200, frame_width - 60)  # 60px Padding (2x30)
-        for btn in self.answer_buttons:
-            btn.config(wraplength=wrap)
-
-
         # Frame für Feedback und Nächste Frage Button
         self.feedback_next_frame = tk.Frame(self.root, pady=10)
         self.feedback_next_frame.pack()
@@ -171,21 +2590,114 @@ class WerkstoffquizApp:
 
         self.next_question_button = tk.Button(self.feedback_next_frame, text="Nächste Frage", font=("Arial", 12))
         self.next_question_button.pack(pady=5)
-        # self.next_question_button.config(state=tk.DISABLED) # Initial deaktiviert
+        self.next_question_button.config(state=tk.DISABLED) # Initial deaktiviert
 
         # --- Menü ---
-        menubar = tk.Menu(self.root)
+        self.menubar = menubar = tk.Menu(self.root)
         
         filemenu = tk.Menu(menubar, tearoff=0)
-        filemenu.add_command(label="Beenden", command=self.root.quit)
+        if PROFILER is not None:
+            filemenu.add_command(label="Profil speichern", command=dump_profile)
+        filemenu.add_command(label="Beenden", command=self.on_close)
         menubar.add_cascade(label="Datei", menu=filemenu)
         
         managementmenu = tk.Menu(menubar, tearoff=0)
         managementmenu.add_command(label="Frage hinzufügen...", command=self.open_add_question_dialog) 
         managementmenu.add_command(label="Antwortkatalog verwalten...", command=self.open_manage_catalog_dialog)
+        managementmenu.add_command(label="Fragen importieren...", command=self.open_import_dialog)
+        managementmenu.add_separator()
+        self.similar_distractors_var = tk.BooleanVar(value=DISTRACTOR_MODE == "similar")
+        managementmenu.add_checkbutton(label="Ähnliche Distraktoren", variable=self.similar_distractors_var,
+                                       command=self.toggle_similar_distractors)
+        self.selection_mode_var = tk.StringVar(value=SELECTION_MODE)
+        managementmenu.add_radiobutton(label="Fragen zufällig ohne Wiederholung", value="deck",
+                                       variable=self.selection_mode_var, command=self.change_selection_mode)
+        managementmenu.add_radiobutton(label="Fragen wiederholen (Leitner)", value="srs",
+                                       variable=self.selection_mode_var, command=self.change_selection_mode)
         menubar.add_cascade(label="Verwaltung", menu=managementmenu)
         
         self.root.config(menu=menubar)
+        menubar.entryconfig("Verwaltung", state=tk.DISABLED) # Bis die Daten geladen sind
+
+        # Fenster-Resize-Event binden, um wraplength der Buttons dynamisch zu setzen
+        self.root.bind("<Configure>", self._update_button_wraplength)
+        # Beim Schließen das Journal in die Snapshots zurückschreiben
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        if background_loading:
+            self._start_loading()
+        else:
+            self._on_data_loaded(*self._load_data())
+
+    def _load_data(self):
+        """Lädt Fragen, Katalog und Auswahlzustand. Jede Datei wird dabei genau einmal gelesen."""
+        answer_catalog = load_answer_catalog()
+        questions = load_questions()
+        scheduler = self._load_scheduler(SELECTION_MODE, self.rng, len(questions))
+        return questions, answer_catalog, scheduler
+
+    def _start_loading(self):
+        """Lädt die Daten in einem Worker-Thread; Tk selbst wird nur im Haupt-Thread angefasst."""
+        self._load_results = queue.Queue()
+
+        def worker():
+            try:
+                self._load_results.put(("ok", self._load_data()))
+            except Exception as e:
+                self._load_results.put(("error", e))
+
+        threading.Thread(target=worker, name="werkstoffquiz-loader", daemon=True).start()
+        self.root.after(LOAD_POLL_MS, self._poll_loading)
+
+    def _poll_loading(self):
+        try:
+            status, result = self._load_results.get_nowait()
+        except queue.Empty:
+            self.root.after(LOAD_POLL_MS, self._poll_loading)
+            return
+        if status == "ok":
+            self._on_data_loaded(*result)
+        else:
+            print(f"Fehler beim Laden der Daten: {result}")
+            self.question_label.config(text=f"Fehler beim Laden der Daten: {result}")
+
+    def _run_in_background(self, name, func, on_done):
+        """Führt func in einem Worker-Thread aus und übergibt das Ergebnis per Polling an
+        on_done im Tk-Thread (wie _start_loading). Bei einem Fehler erhält on_done None."""
+        results = queue.Queue()
+
+        def worker():
+            try:
+                results.put(func())
+            except Exception as e:
+                print(f"Fehler im Hintergrund ({name}): {e}")
+                results.put(None)
+
+        def poll():
+            try:
+                result = results.get_nowait()
+            except queue.Empty:
+                self.root.after(LOAD_POLL_MS, poll)
+                return
+            on_done(result)
+
+        threading.Thread(target=worker, name=name, daemon=True).start()
+        self.root.after(LOAD_POLL_MS, poll)
+
+    def _on_data_loaded(self, questions, answer_catalog, scheduler):
+        """Übernimmt die geladenen Daten (im Tk-Thread) und zeigt die erste Frage an."""
+        self.questions = questions
+        self.answer_catalog = answer_catalog
+        self.engine = QuizEngine(self.questions, self.answer_catalog, self.rng, scheduler)
+        self.engine.event_log = AnswerEventLog()
+        self.engine.session_id = new_session_id()
+        print(f"App gestartet: {len(self.questions)} Fragen, {len(self.answer_catalog)} Katalogeinträge geladen.")
+        self.menubar.entryconfig("Verwaltung", state=tk.NORMAL)
+        self._start_duplicate_indexes()
+        self._start_search_index()
+
+        if self.similar_distractors_var.get():
+            self.toggle_similar_distractors()
 
         # Initial eine Frage anzeigen
         if not self.questions:
@@ -199,10 +2711,71 @@ class WerkstoffquizApp:
                 btn.config(state=tk.DISABLED)
              self.next_question_button.config(state=tk.DISABLED)
         else:
-            self.display_question() 
+            self.display_question()
+
+    @profiled
+    def _update_button_wraplength(self, event=None):
+        # Setzt wraplength der Buttons auf die aktuelle Breite des answer_buttons_frame (abzgl. Padding)
+        frame_width = self.answer_buttons_frame.winfo_width()
+        wrap = max(200, frame_width - 60)  # 60px Padding (2x30)
+        for btn in self.answer_buttons:
+            btn.config(wraplength=wrap)
+
+    def _start_duplicate_indexes(self):
+        """Baut die Beinahe-Duplikat-Indizes in einem Worker-Thread. Bis sie bereit sind, öffnen
+        die Dialoge ohne Duplikatprüfung."""
+        if np is None:
+            return
+        questions, question_count = self.questions, len(self.questions) # Fragen werden nur angehängt
+        answers = list(self.answer_catalog) # Momentaufnahme, der Katalog selbst bleibt im Tk-Thread
+
+        def work():
+            indexes = build_near_duplicate_indexes((questions[i] for i in range(question_count)), answers)
+            return indexes, question_count, answers
+
+        self._run_in_background("werkstoffquiz-duplicates", work, self._on_duplicate_indexes_ready)
+
+    def _on_duplicate_indexes_ready(self, result):
+        if result is None:
+            return
+        (question_index, answer_index), question_count, answers = result
+        # Während des Aufbaus hinzugekommene Einträge nachtragen
+        for position in range(question_count, len(self.questions)):
+            question_index.add(position, self.questions[position].question)
+        known = set(answers)
+        for answer in self.answer_catalog:
+            if answer not in known:
+                answer_index.add(answer, answer)
+        self.question_duplicates, self.answer_duplicates = question_index, answer_index
+
+    def _start_search_index(self):
+        """Baut den Suchindex in einem Worker-Thread. Bis er bereit ist, öffnet die
+        Katalogverwaltung ohne Suchfeld."""
+        questions, question_count = self.questions, len(self.questions) # Fragen werden nur angehängt
+        answers = list(self.answer_catalog)
+
+        def work():
+            index = build_search_index(answers, (questions[i] for i in range(question_count)))
+            return index, question_count, answers
+
+        self._run_in_background("werkstoffquiz-search", work, self._on_search_index_ready)
+
+    def _on_search_index_ready(self, result):
+        if result is None:
+            return
+        index, question_count, answers = result
+        # Während des Aufbaus hinzugekommene Einträge nachtragen
+        known = set(answers)
+        for answer in self.answer_catalog:
+            if answer not in known:
+                index.add_catalog_entry(answer)
+        for position in range(question_count, len(self.questions)):
+            index.add_question(self.questions[position])
+        self.search_index = index
 
     def open_add_question_dialog(self):
-        dialog = AddQuestionDialog(self.root, self.questions, self.answer_catalog, self.save_all_data)
+        dialog = AddQuestionDialog(self.root, self.questions, self.answer_catalog, self.record_changes,
+                                   self.question_duplicates, self.answer_duplicates)
         # Optional: Deaktivieren des Hauptfensters, während Dialog offen ist
         # self.root.wait_window(dialog.top) 
         # Nach Schließen des Dialogs ggf. UI aktualisieren, falls erste Frage hinzugefügt wurde
@@ -210,69 +2783,191 @@ class WerkstoffquizApp:
              self.display_question()
 
     def open_manage_catalog_dialog(self):
-        dialog = ManageCatalogDialog(self.root, self.answer_catalog, self.save_all_data)
+        dialog = ManageCatalogDialog(self.root, self.answer_catalog, self.record_changes, self.search_index,
+                                     self.answer_duplicates)
         # self.root.wait_window(dialog.top) # Optional modal
         # Nach Schließen des Dialogs ggf. UI aktualisieren, falls Katalog relevant war
         self.display_question() # Einfachste Lösung: Frage neu laden, falls Katalog geändert wurde
 
+    def open_import_dialog(self):
+        paths = filedialog.askopenfilenames(parent=self.root, title="Fragen importieren",
+                                            filetypes=[("Fragenquellen", "*.pdf *.csv *.jsonl *.json"),
+                                                       ("Alle Dateien", "*.*")])
+        if not paths:
+            return
+        self.root.config(cursor="watch")
+        self.menubar.entryconfig("Verwaltung", state=tk.DISABLED) # Kein zweiter Import während des Lesens
+
+        def work():
+            try:
+                return read_import_sources(paths)
+            except ImportSourceError as e:
+                return e
+
+        self._run_in_background("werkstoffquiz-import", work, self._on_import_read)
+
+    def _on_import_read(self, pairs):
+        """Übernimmt die im Hintergrund gelesenen Paare im Tk-Thread und speichert sie."""
+        self.root.config(cursor="")
+        self.menubar.entryconfig("Verwaltung", state=tk.NORMAL)
+        if pairs is None:
+            messagebox.showerror("Importfehler", "Der Import ist fehlgeschlagen (Details in der Konsole).",
+                                 parent=self.root)
+            return
+        if isinstance(pairs, ImportSourceError):
+            messagebox.showerror("Importfehler", str(pairs), parent=self.root)
+            return
+        added_questions, added_answers, skipped = merge_import(pairs, self.questions, self.answer_catalog)
+        self._update_indexes(added_questions, added_answers)
+        commit_import(self.questions, self.answer_catalog, added_questions, added_answers, self.saver)
+        messagebox.showinfo("Import abgeschlossen",
+                            f"{len(added_questions)} Fragen und {len(added_answers)} Katalogantworten importiert.\n"
+                            f"{skipped} Einträge übersprungen (Duplikate oder unvollständig).", parent=self.root)
+        if added_questions and self.engine.current_round is None and self.engine.last_round is None:
+            self.display_question()
+
 
     def save_all_data(self):
-        """Speichert sowohl Fragen als auch den Katalog."""
-        save_questions(self.questions)
-        save_answer_catalog(self.answer_catalog)
-        print("Daten gespeichert.")
+        """Merkt Fragen und Katalog als vollständige Snapshots zum Schreiben im Hintergrund vor.
+        Mit self.saver.flush() lässt sich abwarten, bis sie dauerhaft gespeichert sind."""
+        self.saver.schedule(QUESTIONS_FILE, self.questions)
+        self.saver.schedule(CATALOG_FILE, self.answer_catalog)
+
+    def record_changes(self, added_questions=(), added_answers=(), removed_answers=()):
+        """Persistiert einzelne Änderungen. Im Journal-Modus kostet jede Änderung O(1) I/O,
+        das Journal wird erst ab JOURNAL_COMPACT_THRESHOLD Einträgen in die Snapshots gefaltet."""
+        self._update_indexes(added_questions, added_answers)
+        if not USE_JOURNAL:
+            self.save_all_data()
+            return
+        for question in added_questions:
+            append_journal(QUESTIONS_FILE, "add", question)
+        for answer in added_answers:
+            append_journal(CATALOG_FILE, "add", answer)
+        for answer in removed_answers:
+            append_journal(CATALOG_FILE, "remove", answer)
+        compact_journal_if_needed(QUESTIONS_FILE, self.questions, saver=self.saver)
+        compact_journal_if_needed(CATALOG_FILE, self.answer_catalog, saver=self.saver)
+
+    def _update_indexes(self, added_questions, added_answers):
+        """Hält Such-, Duplikat- und Ähnlichkeitsindex inkrementell auf dem Stand der Daten."""
+        if self.search_index is not None:
+            for answer in added_answers:
+                self.search_index.add_catalog_entry(answer)
+            for question in added_questions:
+                self.search_index.add_question(question)
+        if self.question_duplicates is not None:
+            first_position = len(self.questions) - len(added_questions) # Neue Fragen stehen am Ende
+            for position, question in enumerate(added_questions, first_position):
+                self.question_duplicates.add(position, question.question)
+            for answer in added_answers:
+                self.answer_duplicates.add(answer, answer)
+        if added_answers and (self.engine.similarity_index is not None or self._similarity_busy):
+            self._sync_similarity_index() # Inkrementell, Cache wird beim Beenden geschrieben
+
+    def _load_scheduler(self, mode, rng, question_count=None):
+        if question_count is None:
+            question_count = len(self.questions)
+        if mode == "srs":
+            return load_srs_state(question_count, rng)
+        return load_deck_state(question_count, rng)
+
+    def _save_scheduler(self):
+        # Der Leitner-Plan wird bereits pro Antwort angehängt
+        if isinstance(self.engine.scheduler, QuestionDeck):
+            save_deck_state(self.engine.scheduler, self.saver)
+
+    def change_selection_mode(self):
+        """Wechselt zwischen Zufallsstapel und Leitner-Wiederholung und zeigt eine neue Frage."""
+        self._save_scheduler()
+        if isinstance(self.engine.scheduler, QuestionDeck):
+            self._deck = self.engine.scheduler
+        mode = self.selection_mode_var.get()
+        if mode == "deck" and self._deck is not None:
+            self.engine.scheduler = self._deck # Nicht von der Platte: die Sicherung kann noch ausstehen
+        else:
+            self.engine.scheduler = self._load_scheduler(mode, self.engine.rng)
+        self.display_question()
+
+    def toggle_similar_distractors(self):
+        """Schaltet ähnlichkeitsbasierte Distraktoren ein/aus und lädt dafür den Index."""
+        self.engine.use_similar_distractors = self.similar_distractors_var.get()
+        if not self.engine.use_similar_distractors or self.engine.similarity_index is not None or self._similarity_busy:
+            return
+        if np is None:
+            self.similar_distractors_var.set(False)
+            self.engine.use_similar_distractors = False
+            messagebox.showwarning("Hinweis", "Für ähnliche Distraktoren wird NumPy benötigt.", parent=self.root)
+            return
+        self._sync_similarity_index()
+
+    def _sync_similarity_index(self):
+        """Lädt bzw. gleicht den Ähnlichkeitsindex in einem Worker-Thread ab. Solange er nicht
+        bereit ist, hat die Engine keinen Index und wählt zufällige Distraktoren."""
+        if self._similarity_busy:
+            self._similarity_stale = True # Nach dem laufenden Abgleich erneut abgleichen
+            return
+        index, self.engine.similarity_index = self.engine.similarity_index, None
+        catalog = list(self.answer_catalog) # Momentaufnahme, der Katalog selbst bleibt im Tk-Thread
+
+        def work():
+            if index is None:
+                return load_similarity_index(catalog)
+            index.sync(catalog)
+            return index
+
+        self._similarity_busy = True
+        self._run_in_background("werkstoffquiz-similarity", work, self._on_similarity_index_ready)
+
+    def _on_similarity_index_ready(self, index):
+        self._similarity_busy = False
+        self.engine.similarity_index = index
+        if self._similarity_stale:
+            self._similarity_stale = False
+            self._sync_similarity_index()
+
+    def on_close(self):
+        """Faltet offene Journal-Einträge in die Snapshots und beendet die Anwendung."""
+        if self.engine is not None:
+            self._save_scheduler()
+        self.saver.close() # Ausstehende Hintergrund-Schreibvorgänge abschließen
+        if self.engine is not None: # Sonst noch während des Ladens geschlossen
+            compact_journal_if_needed(QUESTIONS_FILE, self.questions, threshold=1)
+            compact_journal_if_needed(CATALOG_FILE, self.answer_catalog, threshold=1)
+            save_similarity_index(self.engine.similarity_index)
+            self.engine.event_log.close()
+        dump_profile()
+        self.root.destroy()
 
     # placeholder_command wird nicht mehr benötigt, da die Menüpunkte jetzt echte Funktionen aufrufen.
     # def placeholder_command(self): 
     #     messagebox.showinfo("Platzhalter", "Diese Funktion wird noch implementiert.")
 
+    @profiled
     def display_question(self):
         """Zeigt eine neue zufällige Frage und Antwortmöglichkeiten an."""
         # Reset der Button-Farben, falls sie im check_answer geändert wurden (optional)
         # for btn in self.answer_buttons:
         #     btn.config(bg=self.root.cget('bg')) # Standardhintergrundfarbe
 
-        if not self.questions:
-            self.question_label.config(text="Keine Fragen vorhanden. Bitte fügen Sie Fragen hinzu.")
+        try:
+            quiz_round = self.engine.next_round()
+        except QuizUnavailable as e:
+            self.question_label.config(text=str(e))
             for btn in self.answer_buttons:
                 btn.config(state=tk.DISABLED, text="-")
             self.next_question_button.config(state=tk.DISABLED)
             self.feedback_label.config(text="")
             return
 
-        # Mindestens 2 Distraktoren für 3 Antwortmöglichkeiten (1 korrekte + 2 falsche)
-        if len(self.answer_catalog) < 2:
-            self.question_label.config(text="Antwortkatalog hat zu wenige Einträge (<2). Bitte ergänzen.")
-            for btn in self.answer_buttons:
-                btn.config(state=tk.DISABLED, text="-")
-            self.next_question_button.config(state=tk.DISABLED)
-            self.feedback_label.config(text="")
-            return
-
-        # Zufällige Frage auswählen (Implementierung fehlt noch - für jetzt die erste)
-        # TODO: Logik für `available_question_indices` wie in JS-Version oder einfacher für Python
-        import random
-        current_question_data = random.choice(self.questions) # Einfache zufällige Auswahl für jetzt
-        
-        self.current_correct_answer_text = current_question_data["correctAnswer"]
-        self.question_label.config(text=current_question_data["question"])
+        self._draws_since_deck_save += 1
+        if self._draws_since_deck_save >= DECK_SAVE_INTERVAL:
+            self._save_scheduler()
+            self._draws_since_deck_save = 0
 
-        # Distraktoren auswählen
-        possible_distractors = [ans for ans in self.answer_catalog if ans.lower() != self.current_correct_answer_text.lower()]
-        
-        if len(possible_distractors) < 2:
-            self.question_label.config(text=f"Nicht genug Distraktoren für Frage: '{current_question_data['question']}'. Katalog erweitern.")
-            for btn in self.answer_buttons:
-                btn.config(state=tk.DISABLED, text="-")
-            self.next_question_button.config(state=tk.DISABLED)
-            self.feedback_label.config(text="")
-            return
-
-        random.shuffle(possible_distractors)
-        chosen_distractors = possible_distractors[:2]
-
-        answer_options = chosen_distractors + [self.current_correct_answer_text]
-        random.shuffle(answer_options) # Antworten mischen
+        self.current_correct_answer_text = quiz_round.correct_answer
+        self.question_label.config(text=quiz_round.question)
+        answer_options = quiz_round.options
 
         # Buttons aktualisieren: Text setzen, aktivieren, zentrieren, Breite dynamisch
         for i, btn in enumerate(self.answer_buttons):
@@ -288,9 +2983,10 @@ class WerkstoffquizApp:
         self.next_question_button.config(state=tk.DISABLED, command=self.display_question) # Nächste Frage Button
 
 
+    @profiled
     def check_answer(self, selected_answer_text):
         """Überprüft die ausgewählte Antwort und gibt Feedback."""
-        is_correct = (selected_answer_text == self.current_correct_answer_text)
+        is_correct = self.engine.check(selected_answer_text)
 
         for btn in self.answer_buttons:
             btn.config(state=tk.DISABLED) # Alle Antwortbuttons deaktivieren
@@ -310,11 +3006,14 @@ class WerkstoffquizApp:
 
 
 class AddQuestionDialog:
-    def __init__(self, parent, questions_list, catalog_list, save_callback):
+    def __init__(self, parent, questions_list, catalog_list, save_callback,
+                 question_duplicates=None, answer_duplicates=None):
         self.parent = parent
         self.questions = questions_list
         self.catalog = catalog_list
         self.save_callback = save_callback
+        self.question_duplicates = question_duplicates # NearDuplicateIndex über die Fragen (optional)
+        self.answer_duplicates = answer_duplicates # NearDuplicateIndex über den Katalog (optional)
         self.question_added = False # Flag, um zu verfolgen, ob eine Frage hinzugefügt wurde
 
         self.top = tk.Toplevel(parent)
@@ -349,30 +3048,143 @@ class AddQuestionDialog:
             messagebox.showerror("Fehler", "Frage und korrekte Antwort dürfen nicht leer sein.", parent=self.top)
             return
 
+        similar = []
+        if self.question_duplicates is not None:
+            for position, similarity in self.question_duplicates.query(question_text, limit=3):
+                similar.append(f"Frage ({similarity:.0%}): {_shorten(self.questions[position].question)}")
+        if self.answer_duplicates is not None and correct_answer_text not in self.catalog:
+            for answer, similarity in self.answer_duplicates.query(correct_answer_text, limit=3):
+                if answer in self.catalog: # Index enthält ggf. inzwischen gelöschte Einträge
+                    similar.append(f"Antwort ({similarity:.0%}): {_shorten(answer)}")
+        if similar and not messagebox.askyesno(
+                "Mögliches Duplikat", "Es gibt sehr ähnliche Einträge:\n\n" + "\n".join(similar) +
+                "\n\nTrotzdem speichern?", parent=self.top):
+            return
+
         # Frage hinzufügen
-        self.questions.append({"question": question_text, "correctAnswer": correct_answer_text})
+        self.questions.append(Question(question_text, correct_answer_text))
         
+        new_question = self.questions[-1]
+
         # Korrekte Antwort zum Katalog hinzufügen, falls nicht vorhanden (case-insensitive)
-        found_in_catalog = False
-        for item in self.catalog:
-            if item.lower() == correct_answer_text.lower():
-                found_in_catalog = True
-                break
-        if not found_in_catalog:
-            self.catalog.append(correct_answer_text)
+        added_answers = []
+        if self.catalog.add(correct_answer_text):
+            added_answers.append(correct_answer_text)
             print(f"'{correct_answer_text}' zum Katalog hinzugefügt.")
 
-        self.save_callback() # Ruft self.master.save_all_data() auf
+        self.save_callback(added_questions=[new_question], added_answers=added_answers) # Ruft record_changes der App auf
         self.question_added = True 
         messagebox.showinfo("Erfolg", "Frage erfolgreich gespeichert.", parent=self.top)
         self.top.destroy()
 
 
+class VirtualListView:
+    """Listbox, die nur die sichtbaren Zeilen einer (beliebig großen) Sequenz darstellt.
+
+    items muss nur __len__ und __getitem__ unterstützen, z.B. AnswerCatalog.sorted_view().
+    Scrollen und Aktualisieren kosten so O(sichtbare Zeilen) statt O(n) Tk-Aufrufe.
+    curselection() und get() arbeiten mit absoluten Positionen wie bei tk.Listbox.
+    """
+
+    def __init__(self, parent, font=("Arial", 10), height=10):
+        self.items = []
+        self.first = 0 # Position der obersten sichtbaren Zeile
+        self.visible_rows = height
+        self.selected = None
+        self.line_height = tkfont.Font(font=font).metrics("linespace") + 1
+
+        self.frame = tk.Frame(parent)
+        self.scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.listbox = tk.Listbox(self.frame, font=font, height=height, exportselection=False)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+
+        self.listbox.bind("<Configure>", self._on_resize)
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.listbox.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        self.listbox.bind("<Up>", lambda e: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda e: self._move_selection(1))
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def set_items(self, items):
+        """Zeigt eine neue Sequenz an, beginnend bei der ersten Zeile."""
+        self.items = items
+        self.first = 0
+        self.selected = None
+        self.refresh()
+
+    def refresh(self):
+        """Zeichnet die sichtbaren Zeilen neu, z.B. nachdem items verändert wurde."""
+        total = len(self.items)
+        self.first = max(0, min(self.first, total - self.visible_rows))
+        last = min(total, self.first + self.visible_rows)
+        self.listbox.delete(0, tk.END)
+        for position in range(self.first, last):
+            self.listbox.insert(tk.END, self.items[position])
+        if self.selected is not None and self.first <= self.selected < last:
+            self.listbox.selection_set(self.selected - self.first)
+        if total:
+            self.scrollbar.set(self.first / total, last / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def see(self, position):
+        """Scrollt so, dass die Zeile position sichtbar ist."""
+        if position < self.first or position >= self.first + self.visible_rows:
+            self.first = max(0, position - self.visible_rows // 2)
+            self.refresh()
+
+    def scroll(self, amount, what):
+        step = self.visible_rows if what == "pages" else 1
+        self.first += int(amount) * step
+        self.refresh()
+        return "break"
+
+    def curselection(self):
+        return () if self.selected is None else (self.selected,)
+
+    def get(self, position):
+        return self.items[position]
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.first = int(float(args[0]) * len(self.items))
+            self.refresh()
+        elif action == "scroll":
+            self.scroll(args[0], args[1])
+
+    def _on_resize(self, event=None):
+        rows = max(1, self.listbox.winfo_height() // self.line_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.refresh()
+
+    def _on_select(self, event=None):
+        selection = self.listbox.curselection()
+        if selection:
+            self.selected = self.first + selection[0]
+
+    def _move_selection(self, delta):
+        if not len(self.items):
+            return "break"
+        current = self.first if self.selected is None else self.selected
+        self.selected = max(0, min(len(self.items) - 1, current + delta))
+        self.see(self.selected)
+        self.refresh()
+        return "break"
+
 class ManageCatalogDialog:
-    def __init__(self, parent, catalog_list, save_callback):
+    def __init__(self, parent, catalog_list, save_callback, search_index=None, answer_duplicates=None):
         self.parent = parent
         self.catalog = catalog_list
         self.save_callback = save_callback
+        self.search_index = search_index
+        self.answer_duplicates = answer_duplicates
+        self._search_job = None
 
         self.top = tk.Toplevel(parent)
         self.top.title("Antwortkatalog verwalten")
@@ -390,16 +3202,19 @@ class ManageCatalogDialog:
         add_button = tk.Button(input_frame, text="Hinzufügen", command=self.add_to_catalog, font=("Arial", 10))
         add_button.pack(side=tk.LEFT, padx=5)
 
-        # Frame für Listbox und Scrollbar
-        list_frame = tk.Frame(self.top)
-        list_frame.pack(pady=5, padx=10, expand=True, fill=tk.BOTH)
+        # Frame für die Suche (Katalog und Fragen)
+        if self.search_index is not None:
+            search_frame = tk.Frame(self.top)
+            search_frame.pack(padx=10, fill=tk.X)
+            tk.Label(search_frame, text="Suchen:", font=("Arial", 10)).pack(side=tk.LEFT)
+            self.search_var = tk.StringVar()
+            self.search_var.trace_add("write", self.schedule_search)
+            search_entry = tk.Entry(search_frame, textvariable=self.search_var, font=("Arial", 10))
+            search_entry.pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
 
-        self.scrollbar = tk.Scrollbar(list_frame, orient=tk.VERTICAL)
-        self.catalog_listbox = tk.Listbox(list_frame, yscrollcommand=self.scrollbar.set, font=("Arial", 10), height=10)
-        self.scrollbar.config(command=self.catalog_listbox.yview)
-        
-        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.catalog_listbox.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        # Liste mit Scrollbar; es werden nur die sichtbaren Zeilen dargestellt
+        self.catalog_listbox = VirtualListView(self.top, font=("Arial", 10), height=10)
+        self.catalog_listbox.pack(pady=5, padx=10, expand=True, fill=tk.BOTH)
 
         self.populate_listbox()
 
@@ -414,9 +3229,27 @@ class ManageCatalogDialog:
 
 
     def populate_listbox(self):
-        self.catalog_listbox.delete(0, tk.END) # Alte Einträge löschen
-        for item in sorted(self.catalog, key=str.lower): # Sortiert anzeigen
-            self.catalog_listbox.insert(tk.END, item)
+        self.catalog_listbox.set_items(self.catalog.sorted_view()) # Sortiert anzeigen
+
+    def schedule_search(self, *args):
+        """Startet die Suche erst nach SEARCH_DEBOUNCE_MS ohne weitere Eingabe."""
+        if self._search_job is not None:
+            self.top.after_cancel(self._search_job)
+        self._search_job = self.top.after(SEARCH_DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        self._search_job = None
+        query = self.search_var.get()
+        if not query.strip():
+            self.populate_listbox()
+            return
+        results = []
+        for kind, text in self.search_index.search(query, SEARCH_RESULT_LIMIT):
+            if kind == "question":
+                results.append(f"[Frage] {text}")
+            elif text in self.catalog: # Inzwischen entfernte Einträge nicht anzeigen
+                results.append(text)
+        self.catalog_listbox.set_items(results)
 
     def add_to_catalog(self):
         new_answer = self.catalog_entry.get().strip()
@@ -424,19 +3257,28 @@ class ManageCatalogDialog:
             messagebox.showerror("Fehler", "Antwort darf nicht leer sein.", parent=self.top)
             return
 
-        is_duplicate = False
-        for item in self.catalog:
-            if item.lower() == new_answer.lower():
-                is_duplicate = True
-                break
-        
-        if is_duplicate:
+        if new_answer in self.catalog: # O(1) über den casefold-Index
             messagebox.showwarning("Warnung", "Diese Antwort ist bereits im Katalog vorhanden.", parent=self.top)
             return
 
-        self.catalog.append(new_answer)
-        self.save_callback() # Speichert den gesamten Katalog
-        self.populate_listbox() # Listbox aktualisieren
+        if self.answer_duplicates is not None:
+            similar = [f"({similarity:.0%}) {_shorten(answer)}"
+                       for answer, similarity in self.answer_duplicates.query(new_answer, limit=3) if answer in self.catalog]
+            if similar and not messagebox.askyesno(
+                    "Mögliches Duplikat", "Es gibt sehr ähnliche Katalogeinträge:\n\n" + "\n".join(similar) +
+                    "\n\nTrotzdem hinzufügen?", parent=self.top):
+                return
+
+        self.catalog.add(new_answer)
+        self.save_callback(added_answers=[new_answer]) # Hängt die Änderung an das Journal an
+        if self.search_index is not None and self.search_var.get().strip():
+            self.run_search() # Aktive Suche mit dem neuen Eintrag aktualisieren
+        else:
+            # Der sortierte Index wurde beim Hinzufügen per binärer Suche ergänzt
+            view = self.catalog.sorted_view()
+            self.catalog_listbox.items = view
+            self.catalog_listbox.see(view.position(new_answer))
+            self.catalog_listbox.refresh()
         self.catalog_entry.delete(0, tk.END) # Eingabefeld leeren
         messagebox.showinfo("Erfolg", f"'{new_answer}' zum Katalog hinzugefügt.", parent=self.top)
 
@@ -453,25 +3295,46 @@ class ManageCatalogDialog:
     #         # Dies erfordert eine sorgfältige Übereinstimmung, da die Listbox sortiert sein kann
     #         # und die self.catalog Liste nicht unbedingt. Am besten über den Text gehen.
     #         try:
-    #             self.catalog.remove(selected_item_text) # Vorsicht bei Duplikaten mit unterschiedlicher Groß-/Kleinschreibung
+    #             self.catalog.remove(selected_item_text) # AnswerCatalog entfernt case-insensitive
     #         except ValueError:
     #             print(f"Konnte {selected_item_text} nicht aus self.catalog entfernen.")
     #             pass # Element nicht gefunden (sollte nicht passieren, wenn populate_listbox korrekt ist)
 
-    #     self.save_callback()
+    #     self.save_callback(removed_answers=[selected_item_text])
     #     self.populate_listbox()
     #     messagebox.showinfo("Erfolg", "Ausgewählte Einträge gelöscht.", parent=self.top)
 
 
 if __name__ == '__main__':
-    # Test der Lade-/Speicherfunktionen
-    print("Teste Lade-/Speicherfunktionen...")
-    current_questions = load_questions()
-    print(f"Geladene Fragen: {len(current_questions)}")
-    current_catalog = load_answer_catalog()
-    print(f"Geladener Katalog: {len(current_catalog)} Einträge. Beispiel: {current_catalog[:3]}")
-    
-    print("\n--- Werkstoffquiz GUI wird hier starten ---")
-    root = tk.Tk()
-    app = WerkstoffquizApp(root)
-    root.mainloop()
+    parser = argparse.ArgumentParser(description="Werkstoffquiz")
+    parser.add_argument("--server", action="store_true",
+                        help="Quiz als HTTP/JSON-Server für die Weboberfläche starten statt des Tk-Fensters")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--import", dest="import_files", nargs="+", metavar="DATEI",
+                        help="Fragen aus PDF-, CSV-, JSONL- oder JSON-Dateien importieren und beenden")
+    parser.add_argument("--analytics", action="store_true",
+                        help=f"Antwortprotokoll {ANSWER_LOG_FILE} auswerten (schwierige Fragen, Verwechslungen, Sitzungen)")
+    parser.add_argument("--duplicates", action="store_true",
+                        help="Gruppen beinahe gleicher Fragen und Katalogantworten auflisten")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"Laufzeiten messen und beim Beenden nach {PROFILE_OUTPUT_FILE} schreiben "
+                             f"(alternativ Umgebungsvariable {PROFILE_ENV_VAR}=1)")
+    args = parser.parse_args()
+    if args.profile or os.environ.get(PROFILE_ENV_VAR, "") not in ("", "0"):
+        enable_profiling()
+    if args.duplicates:
+        sys.exit(0 if run_duplicate_report() else 1)
+    if args.analytics:
+        sys.exit(0 if run_analytics() else 1)
+    if args.import_files:
+        imported = run_import(args.import_files)
+        dump_profile()
+        sys.exit(0 if imported else 1)
+    elif args.server:
+        run_server(args.host, args.port)
+    else:
+        # Die Daten lädt die App selbst (im Hintergrund), damit jede Datei nur einmal gelesen wird
+        root = tk.Tk()
+        app = WerkstoffquizApp(root)
+        root.mainloop()
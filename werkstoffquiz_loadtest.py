@@ -0,0 +1,134 @@
+"""Lasttest für den Werkstoffquiz-Server (python werkstoffquiz_gui.py --server).
+
+Simuliert viele gleichzeitige Quizteilnehmer, die jeweils über eine Keep-Alive-Verbindung
+abwechselnd eine Runde abrufen und beantworten, und gibt Anfragen/s und Latenzen aus.
+
+    python werkstoffquiz_loadtest.py --clients 50 --duration 10
+    python werkstoffquiz_loadtest.py --spawn   # Server für den Test selbst starten
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+
+async def _request(reader, writer, host, method, path, body=None):
+    """Sendet eine Anfrage über die bestehende Verbindung und liefert (Status, JSON-Inhalt)."""
+    payload = json.dumps(body).encode('utf-8') if body is not None else b""
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n").encode('latin-1')
+                 + payload)
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Verbindung vom Server geschlossen")
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode('latin-1').partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    data = await reader.readexactly(length) if length else b""
+    return status, json.loads(data) if data else None
+
+
+async def _client(host, port, deadline, latencies, errors, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, data = await _request(reader, writer, host, "POST", "/api/session", {})
+        session = data["session"]
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, data = await _request(reader, writer, host, "GET", f"/api/round?session={session}")
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+                continue
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, host, "POST", "/api/check",
+                                       {"session": session, "answer": rng.choice(data["options"])})
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run_load_test(host, port, clients, duration, seed=None):
+    """Führt den Lasttest aus und gibt ein dict mit den Kennzahlen zurück."""
+    rng = random.Random(seed)
+    latencies, errors = [], []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(_client(host, port, deadline, latencies, errors, random.Random(rng.random()))
+                           for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+async def _wait_for_server(host, port, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lasttest für den Werkstoffquiz-Server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=50, help="Gleichzeitige Sitzungen")
+    parser.add_argument("--duration", type=float, default=10.0, help="Testdauer in Sekunden")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--spawn", action="store_true",
+                        help="Server als Unterprozess im aktuellen Verzeichnis starten und danach beenden")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "werkstoffquiz_gui.py")
+        server = subprocess.Popen([sys.executable, script, "--server", "--host", args.host, "--port", str(args.port)])
+    try:
+        asyncio.run(_wait_for_server(args.host, args.port))
+        result = asyncio.run(run_load_test(args.host, args.port, args.clients, args.duration, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print(f"{result['requests']} Anfragen von {result['clients']} Sitzungen in {result['seconds']:.1f} s, "
+          f"{result['errors']} Fehler")
+    print(f"{result['requests_per_second']:.0f} Anfragen/s, p50 {result['p50_ms']:.2f} ms, "
+          f"p99 {result['p99_ms']:.2f} ms, max {result['max_ms']:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()